@@ -1,3 +1,4 @@
+from multiprocessing import freeze_support
 from src.game_logic.game import Game
 
 
@@ -6,4 +7,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # the processes of the parallel search start the executable again when it is bundled by PyInstaller
+    freeze_support()
     main()
@@ -12,6 +12,7 @@ a = Analysis(
        ('src/misc', 'src/misc'),
        ('resources', 'resources'),
        ('logs', 'logs'),
+       ('tables', 'tables'),
     ],
     hiddenimports=[],
     hookspath=[],
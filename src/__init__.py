@@ -1 +1 @@
-from . import ai, game_logic, gui, misc
\ No newline at end of file
+from . import ai, game_logic, misc
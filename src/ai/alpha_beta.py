@@ -1,6 +1,61 @@
+import time
+from .move_ordering import Move_Ordering
+from .search_stats import Search_Stats
+from .tablebase import Tablebase
+from .transposition_table import Transposition_Table
+
+
+# Raised inside the search when the time or node budget runs out
+class Search_Timeout(Exception):
+    pass
+
+
 class Alpha_Beta:
     difficulty = "Medium"
 
+    # Budget of the current search (None -> no limit)
+    deadline = None  # time.perf_counter() value
+    node_limit = None
+    nodes = 0
+
+    # Positions already searched, shared between the moves of a match
+    table = Transposition_Table()
+    # The difficulty and board layout the table was filled for
+    table_context = None
+
+    # Killer moves and history of the searches
+    ordering = Move_Ordering()
+    # The depth of the current iteration, to tell the ply of a node
+    root_depth = 0
+    # The depth of the last iteration completed by get_move
+    completed_depth = 0
+    # What the last search did
+    stats = Search_Stats("Alpha-Beta")
+
+    # Exact values of the positions with few edges left (None -> no file for the board size, or not used)
+    tablebase = None
+    use_tablebase = True
+
+    # The tablebase the searches of the layout probe, None if it isn't used
+    # Only the hard ai knows the exact endgames, the others keep their depth caps
+    @staticmethod
+    def get_tablebase(layout):
+        return Tablebase.get(layout) if Alpha_Beta.use_tablebase and Alpha_Beta.difficulty == "Hard" else None
+
+    # What the values stored in the transposition table depend on, the table is cleared when it changes
+    @staticmethod
+    def get_context(layout):
+        return Alpha_Beta.difficulty, Alpha_Beta.use_tablebase, layout
+
+    # Changes the number of entries of the transposition table
+    @staticmethod
+    def set_table_size(size):
+        # assert types
+        assert isinstance(size, int), "Wrong parameter type"
+
+        Alpha_Beta.table = Transposition_Table(size)
+        Alpha_Beta.table_context = None
+
     @staticmethod
     def alpha_beta(board, depth, alpha, beta, maximizing_player):
         # assert types
@@ -9,22 +64,55 @@ class Alpha_Beta:
         assert isinstance(beta, int), "Wrong parameter type"
         assert isinstance(maximizing_player, bool), "Wrong parameter type"
 
+        # stop the search once the budget is spent, checking the clock every 256 nodes
+        Alpha_Beta.nodes += 1
+        if Alpha_Beta.node_limit is not None and Alpha_Beta.nodes > Alpha_Beta.node_limit or \
+           Alpha_Beta.deadline is not None and not Alpha_Beta.nodes & 255 and time.perf_counter() > Alpha_Beta.deadline:
+            raise Search_Timeout()
+
         # if depth is 0 or the game is finished, return the score of the current board
         if depth == 0 or board.is_finished():
+            Alpha_Beta.stats.leaf(Alpha_Beta.root_depth - depth)
             return board.estimate_score(Alpha_Beta.difficulty), None
 
+        # near the end of the game, the tablebase knows how it ends
+        # (not at the root, a move has to be found there)
+        tablebase = Alpha_Beta.tablebase
+        if tablebase is not None and depth < Alpha_Beta.root_depth:
+            value = tablebase.probe(board)
+            if value is not None:
+                return Alpha_Beta.final_score(board, value), None
+
+        # if the position was already searched at least as deep, its value may be enough
+        table = Alpha_Beta.table
+        entry = table.probe(board.hash)
+        table_move = None
+        if entry is not None:
+            _, entry_depth, value, bound, table_move = entry
+            if entry_depth >= depth and \
+               (bound == Transposition_Table.EXACT or
+                bound == Transposition_Table.LOWER and value >= beta or
+                bound == Transposition_Table.UPPER and value <= alpha):
+                table.cutoffs += 1
+                return value, table_move
+
+        original_alpha, original_beta = alpha, beta
+        ply = Alpha_Beta.root_depth - depth
+
         # if the current player is the maximizing player, maximize the score
         if maximizing_player:
-            max_value = -board.limit
+            # lower than any score, so there is always a best move
+            max_value = -board.limit - board.get_total_score() - 1
             best_move = None
-            for move in board.get_possible_moves():
+            for index, move in enumerate(Alpha_Beta.ordering.order(board, ply, table_move)):
                 # try to make the current move
                 if not board.make_move(move[0], move[1], move[2]):
                     # in case the move is invalid
-                    # probably won't happen because of the implementation of get_possible_moves
+                    # probably won't happen because of the implementation of order
                     # but better be safe than sorry
                     continue
-                if board.completed_box:
+                capture = board.completed_box
+                if capture:
                     # if the move completes a box, keep the same player
                     value = Alpha_Beta.alpha_beta(board, depth - 1, alpha, beta, True)[0]
                 else:
@@ -48,20 +136,27 @@ class Alpha_Beta:
 
                 # if beta is less or equal to alpha, prune the tree
                 if beta <= alpha:
+                    Alpha_Beta.stats.cutoff(index)
+
+                    # captures come first anyway, only remember the quiet moves
+                    if not capture:
+                        Alpha_Beta.ordering.cutoff(board, move, ply, depth)
                     break
-            return max_value, best_move
+            best_value = max_value
         # if the current player is the minimizing player, minimize the score
         else:
-            min_value = board.limit
+            # higher than any score, so there is always a best move
+            min_value = board.limit + board.get_total_score() + 1
             best_move = None
-            for move in board.get_possible_moves():
+            for index, move in enumerate(Alpha_Beta.ordering.order(board, ply, table_move)):
                 # try to make the current move
                 if not board.make_move(move[0], move[1], move[2]):
                     # in case the move is invalid
-                    # probably won't happen because of the implementation of get_possible_moves
+                    # probably won't happen because of the implementation of order
                     # but better be safe than sorry
                     continue
-                if board.completed_box:
+                capture = board.completed_box
+                if capture:
                     # if the move completes a box, keep the same player
                     value = Alpha_Beta.alpha_beta(board, depth - 1, alpha, beta, False)[0]
                 else:
@@ -85,18 +180,100 @@ class Alpha_Beta:
 
                 # if beta is less or equal to alpha, prune the tree
                 if beta <= alpha:
+                    Alpha_Beta.stats.cutoff(index)
+
+                    # captures come first anyway, only remember the quiet moves
+                    if not capture:
+                        Alpha_Beta.ordering.cutoff(board, move, ply, depth)
                     break
-            return min_value, best_move
+            best_value = min_value
+
+        # remember what the search proved about the position
+        if best_value <= original_alpha:
+            bound = Transposition_Table.UPPER
+        elif best_value >= original_beta:
+            bound = Transposition_Table.LOWER
+        else:
+            bound = Transposition_Table.EXACT
+        table.store(board.hash, depth, best_value, bound, best_move)
+
+        return best_value, best_move
 
+    # The score of the finished game, when the player to move gets value more boxes than the opponent from now on
     @staticmethod
-    def get_move(game_board, depth):
+    def final_score(board, value):
+        # assert types
+        assert isinstance(value, int), "Wrong parameter type"
+
+        if board.current_player == board.max_symbol:
+            difference = board.max_score - board.min_score + value
+        else:
+            difference = board.max_score - board.min_score - value
+
+        max_score = (board.get_total_score() + difference) // 2
+        return board.final_score(max_score, board.get_total_score() - max_score)
+
+    # Searches start_depth, start_depth + 1, ..., depth moves ahead until the time or node budget runs out
+    # Returns the best move of the last search that was completed
+    @staticmethod
+    def get_move(game_board, depth, time_limit=None, node_limit=None, start_depth=1):
         # assert types
         assert isinstance(depth, int), "Wrong parameter type"
+        assert isinstance(start_depth, int), "Wrong parameter type"
+        assert time_limit is None or isinstance(time_limit, (int, float)), "Wrong parameter type"
+        assert node_limit is None or isinstance(node_limit, int), "Wrong parameter type"
+
+        start = time.perf_counter()
+
+        # an aborted search leaves its moves on the board, so search on a copy
+        board = game_board.copy()
 
-        board = game_board
+        # the stored values depend on the estimation, the tablebase and the board size
+        context = Alpha_Beta.get_context(board.layout)
+        if Alpha_Beta.table_context != context:
+            Alpha_Beta.table.clear()
+            Alpha_Beta.table_context = context
+        Alpha_Beta.table.reset_stats()
+        Alpha_Beta.tablebase = Alpha_Beta.get_tablebase(board.layout)
 
         alpha = -board.limit - board.get_total_score() - 1
         beta = board.limit + board.get_total_score() + 1
         maximing_player = board.current_player == board.max_symbol
 
-        return Alpha_Beta.alpha_beta(board, depth, alpha, beta, maximing_player)[1]
+        # searching deeper than the number of moves left changes nothing
+        depth = min(depth, board.count_possible_moves())
+
+        best_move = None
+        Alpha_Beta.nodes = 0
+        Alpha_Beta.completed_depth = 0
+        Alpha_Beta.stats = stats = Search_Stats("Alpha-Beta")
+        Alpha_Beta.ordering.age()
+        Alpha_Beta.deadline = Alpha_Beta.node_limit = None
+
+        # only a search starting at depth 1 always finishes its first iteration, a deeper start (the odd
+        # Lazy SMP workers) keeps to the budget from the start and may return None
+        if min(start_depth, depth) > 1:
+            if time_limit is not None:
+                Alpha_Beta.deadline = start + time_limit
+            Alpha_Beta.node_limit = node_limit
+
+        for current_depth in range(min(start_depth, depth), depth + 1):
+            Alpha_Beta.root_depth = current_depth
+            try:
+                best_move = Alpha_Beta.alpha_beta(board, current_depth, alpha, beta, maximing_player)[1]
+            except Search_Timeout:
+                break
+            Alpha_Beta.completed_depth = current_depth
+            stats.iterations.append((current_depth, Alpha_Beta.nodes, time.perf_counter() - start))
+
+            # the first search always finishes, so there is a move to return
+            if time_limit is not None:
+                Alpha_Beta.deadline = start + time_limit
+            Alpha_Beta.node_limit = node_limit
+
+        Alpha_Beta.deadline = Alpha_Beta.node_limit = None
+
+        stats.nodes = Alpha_Beta.nodes
+        stats.read_table(Alpha_Beta.table)
+        stats.seconds = time.perf_counter() - start
+        return best_move
@@ -0,0 +1,157 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+from .alpha_beta import Alpha_Beta
+from .engine import Engine
+from .mcts import Mcts
+from .move_ordering import Move_Ordering
+from .perfect_solver import Perfect_Solver
+from ..game_logic.board import Board
+from ..game_logic.layout import Layout
+from ..misc import statistics
+from ..misc.enums import Algorithm, Difficulty
+
+
+# Plays engines against each other without the menus and the graphics (pygame is never imported)
+# The games run in a pool of processes, the engines swap colours after every game
+class Arena:
+    # Plays one game of the given size, the first engine plays max (moves first)
+    # Returns (max score - min score, seconds per move of the first engine, seconds per move of the second)
+    @staticmethod
+    def play_game(no_lines, no_columns, first, second, seed):
+        # assert types
+        assert isinstance(first, Engine), "Wrong parameter type"
+        assert isinstance(second, Engine), "Wrong parameter type"
+        assert isinstance(seed, int), "Wrong parameter type"
+
+        # the board size lives on the class, which starts with the defaults in a new process
+        Board.no_lines, Board.no_columns = no_lines, no_columns
+
+        # every game gets its own move orders and starts from empty tables, so it only depends on its seed
+        # (not on the games the process played before)
+        Board.seed(seed)
+        Mcts.rng.seed(seed)
+        Mcts.root = None
+        Alpha_Beta.table.clear()
+        Alpha_Beta.ordering = Move_Ordering()
+
+        board = Board()
+        engines = {board.max_symbol: first, board.min_symbol: second}
+        latencies = {board.max_symbol: [], board.min_symbol: []}
+
+        while not board.is_finished():
+            player = board.current_player
+
+            start = time.perf_counter()
+            move = engines[player].get_move(board)
+            latencies[player].append(time.perf_counter() - start)
+
+            assert move is not None, f"{engines[player]} can't play"
+            i, j, direction = move
+
+            board.make_move(i, j, direction)
+
+            if not board.completed_box:
+                board.current_player = board.get_opponent()
+
+        return board.max_score - board.min_score, latencies[board.max_symbol], latencies[board.min_symbol]
+
+    # Plays no_games games between the two engines, with the given number of processes
+    # Returns (the margins of the first engine, one per game, and the seconds per move of each engine)
+    @staticmethod
+    def play_match(no_lines, no_columns, engines, no_games, workers=1, seed=0):
+        # assert types
+        assert isinstance(no_games, int), "Wrong parameter type"
+        assert isinstance(workers, int), "Wrong parameter type"
+
+        # assert values
+        assert len(engines) == 2, "Wrong parameter"
+        assert no_games >= 1 and workers >= 1, "Wrong parameter"
+
+        # the values of the perfect solver are loaded once here, the processes get them with the rest of the memory
+        # (or from their file)
+        if any(str(engine.difficulty) == "Hard" and engine.use_tables for engine in engines):
+            Perfect_Solver.get(Layout.get(no_lines, no_columns))
+
+        # the engines swap colours every game
+        games = [(no_lines, no_columns, engines[index % 2], engines[1 - index % 2], seed + index)
+                 for index in range(no_games)]
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(Arena.play_game, *zip(*games),
+                                            chunksize=max(1, no_games // (4 * workers))))
+        else:
+            results = [Arena.play_game(*game) for game in games]
+
+        margins = []
+        latencies = ([], [])
+        for index, (margin, first_latencies, second_latencies) in enumerate(results):
+            if index % 2:
+                margin, first_latencies, second_latencies = -margin, second_latencies, first_latencies
+            margins.append(margin)
+            latencies[0].extend(first_latencies)
+            latencies[1].extend(second_latencies)
+        return margins, latencies
+
+    # The table printed at the end of a match
+    @staticmethod
+    def report(engines, margins, latencies):
+        lines = ["Engine               |  Wins | Draws | Losses | Win rate | Avg margin |  p50 ms |  p90 ms |  p99 ms"]
+
+        for index, engine in enumerate(engines):
+            sign = 1 if index == 0 else -1
+            wins = sum(1 for margin in margins if sign * margin > 0)
+            losses = sum(1 for margin in margins if sign * margin < 0)
+            draws = len(margins) - wins - losses
+
+            # the draws count as half a win
+            win_rate = (wins + draws / 2) / len(margins)
+            average = sign * sum(margins) / len(margins)
+            p50, p90, p99 = (1000 * statistics.percentile(latencies[index], fraction) for fraction in (0.5, 0.9, 0.99))
+
+            lines.append(f"{str(engine):<20} | {wins:>5} | {draws:>5} | {losses:>6} | {win_rate:>8.1%} | "
+                         f"{average:>+10.2f} | {p50:>7.1f} | {p90:>7.1f} | {p99:>7.1f}")
+        return "\n".join(lines)
+
+
+# Reads an engine given as algorithm:difficulty, like alpha_beta:hard, ida_star:medium or mcts:easy
+def parse_engine(argument):
+    try:
+        algorithm, difficulty = argument.upper().split(':')
+        return Algorithm[algorithm], Difficulty[difficulty]
+    except (KeyError, ValueError):
+        raise argparse.ArgumentTypeError(f"{argument} isn't algorithm:difficulty")
+
+
+# python -m src.ai.arena alpha_beta:hard ida_star:medium --size 4x4 --games 1000 --workers 8
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.ai.arena", description="Plays two engines against each other")
+    parser.add_argument("engines", nargs=2, type=parse_engine, metavar="algorithm:difficulty",
+                        help=f"algorithms: {', '.join(a.name.lower() for a in Algorithm if a != Algorithm.BAYESIAN_NETWORK)}"
+                             f" - difficulties: {', '.join(d.name.lower() for d in Difficulty)}")
+    parser.add_argument("--size", default="4x4", help="dots per line x dots per column (default 4x4)")
+    parser.add_argument("--games", type=int, default=100, help="number of games (default 100)")
+    parser.add_argument("--workers", type=int, default=cpu_count() or 1, help="processes (default: all the cores)")
+    parser.add_argument("--time-limit", type=float, help="seconds per move of the hard searches")
+    parser.add_argument("--node-limit", type=int, help="nodes per move of the Alpha-Beta searches")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (default 0)")
+    parser.add_argument("--no-tables", action="store_true",
+                        help="play without the perfect solver, the opening books and the tablebases")
+    arguments = parser.parse_args()
+
+    no_lines, no_columns = (int(size) for size in arguments.size.split('x'))
+    engines = [Engine(algorithm, difficulty, arguments.time_limit, arguments.node_limit,
+                      use_tables=not arguments.no_tables)
+               for algorithm, difficulty in arguments.engines]
+
+    start = time.perf_counter()
+    margins, latencies = Arena.play_match(no_lines, no_columns, engines, arguments.games,
+                                          arguments.workers, arguments.seed)
+    duration = time.perf_counter() - start
+    no_moves = len(latencies[0]) + len(latencies[1])
+
+    print(f"{no_lines}x{no_columns}, {arguments.games} games, {arguments.workers} processes, {duration:.1f} seconds "
+          f"({arguments.games / duration:.2f} games/s, {no_moves / duration:.1f} moves/s)")
+    print(Arena.report(engines, margins, latencies))
@@ -0,0 +1,108 @@
+import numpy as np
+
+
+# Many playouts of the same position at once, with NumPy
+#
+# The K boards are rows of arrays: the drawn edges (K x edges), the sides of every box (K x boxes),
+# the scores (K x 2, max then min) and the player to move (0 -> max, 1 -> min)
+# Every ply chooses, draws and scores one edge on all the unfinished boards with a few array operations
+class Batch_Playout:
+    # Playout policies
+    RANDOM = "random"  # any free edge
+    GREEDY = "greedy"  # complete a box if possible, else a safe edge, else any edge
+
+    def __init__(self, board, no_boards, seed=None):
+        # assert types
+        assert isinstance(no_boards, int), "Wrong parameter type"
+
+        # assert values
+        assert no_boards >= 1, "Wrong parameter"
+
+        layout = board.layout
+        self.layout = layout
+        self.no_boards = no_boards
+        self.rng = np.random.default_rng(seed)
+
+        # incidence[edge, box] -> 1 if the edge is a side of the box
+        self.incidence = np.zeros((layout.no_edges, layout.no_boxes), dtype=np.int8)
+        for box, sides in enumerate(layout.box_edges):
+            self.incidence[list(sides), box] = 1
+
+        # edge_boxes[edge] -> the (at most two) boxes of the edge, the missing ones point to an extra column
+        self.edge_boxes = np.full((layout.no_edges, 2), layout.no_boxes, dtype=np.intp)
+        for edge, boxes in enumerate(layout.edge_boxes):
+            self.edge_boxes[edge, :len(boxes)] = boxes
+
+        # every board starts as the given one
+        drawn = np.array([board.edges >> edge & 1 for edge in range(layout.no_edges)], dtype=bool)
+        self.edges = np.tile(drawn, (no_boards, 1))
+
+        # one more column of sides, always 0, for the missing boxes of the border edges
+        self.sides = np.zeros((no_boards, layout.no_boxes + 1), dtype=np.int8)
+        self.sides[:, :-1] = board.sides
+
+        self.scores = np.tile(np.array([board.max_score, board.min_score], dtype=np.int16), (no_boards, 1))
+        self.turn = np.full(no_boards, int(board.current_player == board.min_symbol), dtype=np.intp)
+
+    # K x edges, True for the edges not drawn yet
+    def free(self):
+        return ~self.edges
+
+    # K, True for the finished boards
+    def finished(self):
+        return self.edges.all(axis=1)
+
+    # Returns the edge chosen on every board by the policy (-1 on the finished ones)
+    def choose(self, policy=GREEDY):
+        free = self.free()
+        priority = self.rng.random(free.shape)
+
+        if policy == Batch_Playout.GREEDY:
+            sides = self.sides[:, :-1]
+
+            # the edges of boxes with 3 sides complete them, the edges of boxes with 2 sides give them away
+            capture = (sides == 3).astype(np.int8) @ self.incidence.T > 0
+            unsafe = (sides >= 2).astype(np.int8) @ self.incidence.T > 0
+            priority += 2 * capture + ~unsafe
+
+        priority[~free] = -1
+        chosen = priority.argmax(axis=1)
+        chosen[~free.any(axis=1)] = -1
+        return chosen
+
+    # Draws the given edge on every board (-1 -> nothing), scoring the completed boxes and passing the turn
+    def play(self, chosen):
+        active = np.flatnonzero(chosen >= 0)
+        edges = chosen[active]
+
+        self.edges[active, edges] = True
+
+        # the sides of the boxes of the edges, and how many of them got completed
+        boxes = self.edge_boxes[edges]
+        rows = active[:, None]
+        self.sides[rows, boxes] += 1
+        self.sides[:, -1] = 0
+        completed = (self.sides[rows, boxes] == 4) & (boxes < self.layout.no_boxes)
+        completed = completed.sum(axis=1)
+
+        # the boxes go to the player to move, who keeps the turn
+        self.scores[active, self.turn[active]] += completed.astype(np.int16)
+        self.turn[active] ^= completed == 0
+
+    # Plays all the boards to the end, returns the final margins (max - min) of every board
+    def run(self, policy=GREEDY):
+        while True:
+            chosen = self.choose(policy)
+            if (chosen < 0).all():
+                break
+            self.play(chosen)
+        return self.margins()
+
+    # K, the score of max - the score of min
+    def margins(self):
+        return self.scores[:, 0].astype(np.int32) - self.scores[:, 1]
+
+    # Plays no_boards playouts of the board, returns their final margins (max - min)
+    @staticmethod
+    def playout(board, no_boards, policy=GREEDY, seed=None):
+        return Batch_Playout(board, no_boards, seed).run(policy)
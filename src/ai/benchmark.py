@@ -0,0 +1,210 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from os import makedirs, path
+from random import Random
+from .alpha_beta import Alpha_Beta
+from .engine import Engine
+from .ida_star import Ida_Star
+from .move_ordering import Move_Ordering
+from ..game_logic.board import Board
+
+
+# Searches a fixed set of positions at fixed depths and reports the work done, as JSON
+# Every search starts from empty tables with a seeded move order, so the nodes and the moves only change
+# when the search changes, and two reports can be diffed between commits (the times depend on the machine)
+class Benchmark:
+    corpus_dir = path.normpath(path.join(path.dirname(__file__), '..', '..', 'benchmarks'))
+
+    sizes = [(no_lines, no_columns) for no_lines in range(2, 8) for no_columns in range(2, 8)]
+    algorithms = ["alpha_beta", "ida_star"]
+
+    # The corpus file of the given size
+    @staticmethod
+    def file_path(no_lines, no_columns):
+        return path.join(Benchmark.corpus_dir, f"{no_lines}x{no_columns}.json")
+
+    # Returns no_positions positions of the current size as lists of (i, j, direction) moves from the empty board,
+    # from the first move to the endgame, played by a capture-aware random policy
+    @staticmethod
+    def make_corpus(no_positions, seed=0):
+        rng = Random(seed)
+        positions = []
+
+        for index in range(no_positions):
+            board = Board()
+            plies = index * board.count_possible_moves() // no_positions
+            moves = []
+
+            for _ in range(plies):
+                capture = board.almost_completed_edges()
+                edges = list(board.generate_edges())
+                safe = [edge for edge in edges if board.is_safe_edge(edge)]
+                edge = capture[0] if capture else rng.choice(sorted(safe or edges))
+
+                moves.append(board.layout.moves[edge])
+                board.make_edge(edge)
+                if not board.completed_box:
+                    board.current_player = board.get_opponent()
+            positions.append(moves)
+        return positions
+
+    # Writes the corpus, one position per line
+    @staticmethod
+    def save_corpus(no_lines, no_columns, positions, file_path=None):
+        if file_path is None:
+            file_path = Benchmark.file_path(no_lines, no_columns)
+
+        makedirs(path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as f:
+            f.write(f'{{"size": [{no_lines}, {no_columns}], "positions": [\n')
+            f.write(",\n".join(json.dumps([list(move) for move in moves]) for moves in positions))
+            f.write("\n]}\n")
+
+    # Returns the positions of the corpus of the given size
+    @staticmethod
+    def load_corpus(no_lines, no_columns, file_path=None):
+        if file_path is None:
+            file_path = Benchmark.file_path(no_lines, no_columns)
+
+        with open(file_path) as f:
+            corpus = json.load(f)
+
+        assert corpus["size"] == [no_lines, no_columns], "Wrong corpus size"
+        return [[tuple(move) for move in moves] for moves in corpus["positions"]]
+
+    # Returns the board after the moves, the board size has to be set already
+    @staticmethod
+    def play(moves):
+        board = Board()
+        for i, j, direction in moves:
+            board.make_move(i, j, direction)
+            if not board.completed_box:
+                board.current_player = board.get_opponent()
+        return board
+
+    # Searches the board with the algorithm and returns what the report keeps of it
+    @staticmethod
+    def search(board, algorithm, depth, seed):
+        # assert values
+        assert algorithm in Benchmark.algorithms, "Wrong parameter"
+
+        # the same start for every search: empty tables, the same shuffle of the moves
+        Alpha_Beta.table.clear()
+        Alpha_Beta.ordering = Move_Ordering()
+        Board.seed(seed)
+
+        start = time.perf_counter()
+        if algorithm == "alpha_beta":
+            move = Alpha_Beta.get_move(board, depth)
+            stats = Alpha_Beta.stats
+        else:
+            Ida_Star.computer_symbol = board.current_player
+            move = Ida_Star.get_move(board, depth)
+            stats = Ida_Star.stats
+        seconds = time.perf_counter() - start
+        nodes = stats.nodes
+
+        return {
+            "algorithm": algorithm,
+            "depth": depth,
+            "move": list(move) if move is not None else None,
+            "nodes": nodes,
+            "seconds": round(seconds, 6),
+            "nodes_per_second": round(nodes / seconds) if seconds > 0 else None,
+            # Alpha-Beta: depth of every iteration, IDA*: bound of every iteration
+            "time_to_depth": [[limit, nodes, round(seconds, 6)] for limit, nodes, seconds in stats.iterations],
+        }
+
+    # Runs the benchmark on the corpus of every size
+    # depth None -> the depth of Engine.depths for the size (at least 1)
+    @staticmethod
+    def run(sizes, algorithms, depth=None, difficulty="Hard", seed=0):
+        # the tablebase files depend on the machine, the searches must not
+        settings = (Alpha_Beta.use_tablebase, Alpha_Beta.difficulty, Ida_Star.difficulty,
+                    Board.no_lines, Board.no_columns)
+        Alpha_Beta.use_tablebase = False
+        Alpha_Beta.difficulty = Ida_Star.difficulty = difficulty
+
+        results = []
+        try:
+            for size in sizes:
+                Board.no_lines, Board.no_columns = size
+                size_depth = depth if depth is not None else max(1, Engine.depths.get(size, 1))
+
+                for index, moves in enumerate(Benchmark.load_corpus(*size)):
+                    board = Benchmark.play(moves)
+                    for algorithm in algorithms:
+                        result = Benchmark.search(board, algorithm, size_depth, seed)
+                        results.append({"size": f"{size[0]}x{size[1]}", "position": index, **result})
+        finally:
+            (Alpha_Beta.use_tablebase, Alpha_Beta.difficulty, Ida_Star.difficulty,
+             Board.no_lines, Board.no_columns) = settings
+
+        totals = {}
+        for algorithm in algorithms:
+            nodes = sum(result["nodes"] for result in results if result["algorithm"] == algorithm)
+            seconds = sum(result["seconds"] for result in results if result["algorithm"] == algorithm)
+            totals[algorithm] = {
+                "nodes": nodes,
+                "seconds": round(seconds, 6),
+                "nodes_per_second": round(nodes / seconds) if seconds > 0 else None,
+            }
+
+        return {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "difficulty": difficulty,
+            "seed": seed,
+            "totals": totals,
+            "results": results,
+        }
+
+
+# Reads a board size given as 4x4
+def parse_size(argument):
+    try:
+        no_lines, no_columns = (int(size) for size in argument.split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{argument} isn't lines x columns")
+    if (no_lines, no_columns) not in Benchmark.sizes:
+        raise argparse.ArgumentTypeError(f"{argument} isn't between 2x2 and 7x7")
+    return no_lines, no_columns
+
+
+# python -m src.ai.benchmark --sizes 4x4 5x5 --output before.json
+# python -m src.ai.benchmark --make-corpus  (writes the positions again, only when the corpus itself has to change)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.ai.benchmark",
+                                     description="Searches the positions of the corpus at fixed depths")
+    parser.add_argument("--sizes", nargs='+', type=parse_size, default=Benchmark.sizes,
+                        help="board sizes, like 4x4 (default: all from 2x2 to 7x7)")
+    parser.add_argument("--algorithms", nargs='+', choices=Benchmark.algorithms, default=Benchmark.algorithms)
+    parser.add_argument("--depth", type=int, help="depth of every search (default: the depth table of the game)")
+    parser.add_argument("--difficulty", choices=["Easy", "Medium", "Hard"], default="Hard",
+                        help="the estimation used by the searches (default Hard)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the move order (default 0)")
+    parser.add_argument("--output", help="file of the JSON report (default: the standard output)")
+    parser.add_argument("--make-corpus", type=int, nargs='?', const=8, metavar="POSITIONS",
+                        help="writes the corpus of the sizes instead (default 8 positions per size)")
+    arguments = parser.parse_args()
+
+    if arguments.make_corpus:
+        for no_lines, no_columns in arguments.sizes:
+            Board.no_lines, Board.no_columns = no_lines, no_columns
+            positions = Benchmark.make_corpus(arguments.make_corpus, arguments.seed + 8 * no_lines + no_columns)
+            Benchmark.save_corpus(no_lines, no_columns, positions)
+        print(f"{len(arguments.sizes)} corpus files written to {Benchmark.corpus_dir}")
+        sys.exit(0)
+
+    report = Benchmark.run(arguments.sizes, arguments.algorithms, arguments.depth, arguments.difficulty,
+                           arguments.seed)
+    text = json.dumps(report, indent=1)
+
+    if arguments.output is None:
+        print(text)
+    else:
+        with open(arguments.output, 'w') as f:
+            f.write(text + "\n")
@@ -0,0 +1,58 @@
+import sys
+from os import cpu_count
+from random import Random
+from .alpha_beta import Alpha_Beta
+from .engine import Engine
+from .lazy_smp import Lazy_Smp
+from ..game_logic.board import Board
+
+
+# Returns boards of the current size after a few random safe moves (the first one is empty)
+def opening_boards(no_boards, seed):
+    rng = Random(seed)
+    boards = []
+
+    for index in range(no_boards):
+        board = Board()
+        for _ in range(2 * index):
+            edges = [edge for edge in board.generate_edges() if board.is_safe_edge(edge)]
+            if not edges:
+                break
+            board.make_edge(rng.choice(edges))
+            board.current_player = board.get_opponent()
+        boards.append(board)
+    return boards
+
+
+# Compares the depth reached in the same time with 1, 2, 4, ... processes, for every size of Engine.depths
+# python -m src.ai.benchmark_lazy_smp [seconds per search = 1] [boards per size = 3] [sizes, as 5x5 ...]
+if __name__ == "__main__":
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    no_boards = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sizes = [tuple(int(size) for size in argument.split('x')) for argument in sys.argv[3:]] or \
+            [size for size in Engine.depths if Engine.depths[size]]
+
+    counts = [1]
+    while counts[-1] * 2 <= (cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+
+    Alpha_Beta.difficulty = "Hard"
+    print(f"Average depth in {time_limit} seconds, {no_boards} boards per size, {cpu_count()} cores")
+    print("  Size  | " + " | ".join(f"{count:>2} proc." for count in counts))
+
+    for no_lines, no_columns in sizes:
+        Board.no_lines, Board.no_columns = no_lines, no_columns
+        boards = opening_boards(no_boards, no_lines * 8 + no_columns)
+
+        averages = []
+        for count in counts:
+            depths = []
+            for board in boards:
+                Lazy_Smp.get_move(board, board.count_possible_moves(), count, time_limit)
+                depths.append(Lazy_Smp.completed_depth)
+            averages.append(sum(depths) / len(depths))
+
+        print(f"{no_lines}x{no_columns}".center(8) + "| " +
+              " | ".join(f"{average:8.2f}" for average in averages))
+
+    Lazy_Smp.shutdown()
@@ -0,0 +1,36 @@
+import argparse
+import time
+from .benchmark import parse_size
+from .engine import Engine
+from .opening_book import Opening_Book
+from ..game_logic.board import Board
+from ..game_logic.layout import Layout
+
+
+# Builds the opening books of the board sizes from self-played games, one file per size
+# python -m src.ai.build_opening_book [--sizes 4x4 5x5] [--plies 6] [--games 20] [--time-limit 10]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.ai.build_opening_book",
+                                     description="Builds the opening books from self-played games")
+    parser.add_argument("--sizes", nargs='+', type=parse_size, default=list(Engine.depths),
+                        help="board sizes, like 4x4 (default: every size of the game)")
+    parser.add_argument("--plies", type=int, default=6, help="moves of every game kept in the book (default 6)")
+    parser.add_argument("--games", type=int, default=20, help="games per size (default 20)")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="seconds per position (default 10)")
+    arguments = parser.parse_args()
+
+    # the fixed move order keeps the book the same from one build to another
+    Board.ordered_moves = True
+
+    for no_lines, no_columns in arguments.sizes:
+        Board.no_lines, Board.no_columns = no_lines, no_columns
+        layout = Layout.get(no_lines, no_columns)
+        file_path = Opening_Book.file_path(no_lines, no_columns)
+
+        start = time.perf_counter()
+        book = Opening_Book(layout)
+        book.build(Board(), arguments.plies, arguments.games, arguments.time_limit)
+        book.save(file_path)
+
+        print(f"{no_lines}x{no_columns}: {len(book)} positions in {time.perf_counter() - start:.1f} seconds, "
+              f"saved to {file_path}")
@@ -0,0 +1,26 @@
+import sys
+import time
+from .perfect_solver import Perfect_Solver
+from ..game_logic.layout import Layout
+
+
+# Solves a board size completely and saves the values
+# python -m src.ai.build_perfect_solver <dots per line> <dots per column>
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.ai.build_perfect_solver <dots per line> <dots per column>")
+        sys.exit(1)
+
+    no_lines, no_columns = (int(argument) for argument in sys.argv[1:])
+    layout = Layout.get(no_lines, no_columns)
+
+    if layout.no_edges > Perfect_Solver.max_edges:
+        print(f"A {no_lines}x{no_columns} board has {layout.no_edges} edges, "
+              f"the perfect solver handles at most {Perfect_Solver.max_edges}")
+        sys.exit(1)
+
+    start = time.time()
+    values = Perfect_Solver.build(layout)
+    print(f"{len(values)} positions solved in {time.time() - start:.1f} seconds, "
+          f"first player's margin: {int(values[0])}, "
+          f"saved to {Perfect_Solver.file_path(no_lines, no_columns)}")
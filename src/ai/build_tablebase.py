@@ -0,0 +1,14 @@
+import sys
+from .tablebase import Tablebase
+
+
+# Generates the tablebase of a board size
+# python -m src.ai.build_tablebase <dots per line> <dots per column> <most free edges>
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("Usage: python -m src.ai.build_tablebase <dots per line> <dots per column> <most free edges>")
+        sys.exit(1)
+
+    no_lines, no_columns, max_free = (int(argument) for argument in sys.argv[1:])
+    no_records = Tablebase.generate(no_lines, no_columns, max_free)
+    print(f"{no_records} positions written to {Tablebase.file_path(no_lines, no_columns)}")
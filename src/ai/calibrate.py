@@ -0,0 +1,172 @@
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+from os import makedirs, path
+from .alpha_beta import Alpha_Beta
+from .benchmark import Benchmark, parse_size
+from .engine import Engine
+from .ida_star import Ida_Star
+from .move_ordering import Move_Ordering
+from ..game_logic.board import Board
+from ..misc import statistics
+from ..misc.enums import Algorithm
+
+
+# Finds the depths of the searches on this machine: for every board size and algorithm, the largest depth
+# whose search of the benchmark positions takes at most the target latency (at the given percentile)
+# The table is saved next to the logs, the game reads it when it starts and uses the built-in one without it
+# The hard Alpha-Beta of the game then searches at most to the calibrated depth, within its time limit
+class Calibration:
+    if getattr(sys, 'frozen', False):  # if the application is bundled by PyInstaller
+        log_dir = path.join(sys._MEIPASS, 'logs')
+    else:
+        log_dir = path.join(path.dirname(__file__), '..', '..', 'logs')
+
+    file_name = "depths.json"
+
+    # The algorithms that search to a depth, by their name in the file
+    algorithms = {"alpha_beta": Algorithm.ALPHA_BETA, "ida_star": Algorithm.IDA_STAR}
+
+    # The file of the table in the given directory
+    @staticmethod
+    def file_path(log_dir=None):
+        return path.normpath(path.join(Calibration.log_dir if log_dir is None else log_dir, Calibration.file_name))
+
+    # The seconds of the search of every board at the depth
+    # An Alpha-Beta search still running after the target latency is stopped, it counts as infinitely slow
+    @staticmethod
+    def latencies(boards, algorithm, depth, target):
+        # assert values
+        assert algorithm in Calibration.algorithms, "Wrong parameter"
+
+        results = []
+        for board in boards:
+            # every search starts from empty tables, as in the benchmark
+            Alpha_Beta.table.clear()
+            Alpha_Beta.ordering = Move_Ordering()
+            Board.seed(0)
+
+            start = time.perf_counter()
+            if algorithm == "alpha_beta":
+                Alpha_Beta.get_move(board, depth, target)
+                seconds = time.perf_counter() - start
+                if Alpha_Beta.completed_depth < min(depth, board.count_possible_moves()):
+                    seconds = math.inf
+            else:
+                Ida_Star.computer_symbol = board.current_player
+                Ida_Star.get_move(board, depth)
+                seconds = time.perf_counter() - start
+            results.append(seconds)
+        return results
+
+    # Returns the largest depth (at least 1, at most max_depth) whose latency at the percentile is at most target
+    @staticmethod
+    def find_depth(boards, algorithm, target, percentile=0.95, max_depth=12):
+        # assert types
+        assert isinstance(target, (int, float)), "Wrong parameter type"
+        assert isinstance(max_depth, int), "Wrong parameter type"
+
+        # assert values
+        assert 0 < percentile <= 1 and max_depth >= 1, "Wrong parameter"
+
+        # searching deeper than the moves left changes nothing
+        max_depth = min(max_depth, max(board.count_possible_moves() for board in boards))
+
+        best_depth = 1
+        for depth in range(1, max_depth + 1):
+            if statistics.percentile(Calibration.latencies(boards, algorithm, depth, target), percentile) > target:
+                break
+            best_depth = depth
+        return best_depth
+
+    # Returns algorithm name -> (no_lines, no_columns) -> depth, for the positions of the benchmark corpus
+    @staticmethod
+    def calibrate(sizes, algorithms, target, percentile=0.95, max_depth=12, difficulty="Hard", log=None):
+        settings = (Alpha_Beta.difficulty, Ida_Star.difficulty, Board.no_lines, Board.no_columns)
+        Alpha_Beta.difficulty = Ida_Star.difficulty = difficulty
+
+        table = {}
+        try:
+            for algorithm in algorithms:
+                depths = table.setdefault(str(Calibration.algorithms[algorithm]), {})
+
+                for size in sizes:
+                    Board.no_lines, Board.no_columns = size
+                    boards = [Benchmark.play(moves) for moves in Benchmark.load_corpus(*size)]
+                    depths[size] = Calibration.find_depth(boards, algorithm, target, percentile, max_depth)
+
+                    if log is not None:
+                        log(f"{algorithm} {size[0]}x{size[1]}: depth {depths[size]}")
+        finally:
+            Alpha_Beta.difficulty, Ida_Star.difficulty, Board.no_lines, Board.no_columns = settings
+        return table
+
+    # Writes the table, with the settings it was found with
+    @staticmethod
+    def save(table, target, percentile, file_path=None):
+        if file_path is None:
+            file_path = Calibration.file_path()
+
+        data = {
+            "target": target,
+            "percentile": percentile,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "depths": {algorithm: {f"{no_lines}x{no_columns}": depth
+                                   for (no_lines, no_columns), depth in depths.items()}
+                       for algorithm, depths in table.items()},
+        }
+
+        makedirs(path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as f:
+            json.dump(data, f, indent=1)
+            f.write("\n")
+
+    # Returns algorithm name -> (no_lines, no_columns) -> depth, the sizes left out keep the built-in depths
+    # A missing or broken file gives an empty table, so the built-in one is used
+    @staticmethod
+    def load(file_path=None):
+        if file_path is None:
+            file_path = Calibration.file_path()
+
+        try:
+            with open(file_path) as f:
+                data = json.load(f)
+
+            table = {}
+            for algorithm, depths in data["depths"].items():
+                table[algorithm] = dict(Engine.depths)
+                for size, depth in depths.items():
+                    no_lines, no_columns = (int(number) for number in size.split('x'))
+                    table[algorithm][(no_lines, no_columns)] = int(depth)
+            return table
+        except (OSError, ValueError, KeyError, AttributeError, TypeError):
+            return {}
+
+
+# Calibrates the depths of the game on this machine, for a target latency per move (default: the time limit of the game)
+# python -m src.ai.calibrate [--target 2.0] [--percentile 0.95] [--sizes 4x4 5x5] [--algorithms alpha_beta]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m src.ai.calibrate",
+                                     description="Finds the search depths of the game for this machine")
+    parser.add_argument("--target", type=float, default=Engine.time_limit,
+                        help=f"seconds per move (default: the time limit of the game, {Engine.time_limit})")
+    parser.add_argument("--percentile", type=float, default=0.95,
+                        help="fraction of the moves that have to meet the target (default 0.95)")
+    parser.add_argument("--sizes", nargs='+', type=parse_size, default=Benchmark.sizes,
+                        help="board sizes, like 4x4 (default: all from 2x2 to 7x7)")
+    parser.add_argument("--algorithms", nargs='+', choices=list(Calibration.algorithms),
+                        default=list(Calibration.algorithms))
+    parser.add_argument("--max-depth", type=int, default=12, help="the deepest depth tried (default 12)")
+    parser.add_argument("--output", help=f"file of the table (default: {Calibration.file_path()})")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    table = Calibration.calibrate(arguments.sizes, arguments.algorithms, arguments.target, arguments.percentile,
+                                  arguments.max_depth, log=print)
+    Calibration.save(table, arguments.target, arguments.percentile, arguments.output)
+
+    print(f"Saved to {arguments.output or Calibration.file_path()} in {time.perf_counter() - start:.1f} seconds")
@@ -0,0 +1,164 @@
+class Endgame_Solver:
+    # shapes -> value, shared by all the positions (and all the board sizes)
+    # shapes is a sorted tuple of ("chain" or "loop", length), one per closed component
+    values = {}
+
+    # Returns True if the solver can play the position:
+    # every box left has at least 2 sides, so every move gives boxes away
+    # and the board is a sum of independent chains and loops
+    @staticmethod
+    def applies(board):
+        if board.is_finished():
+            return False
+
+        all_boxes = (1 << board.layout.no_boxes) - 1
+        return board.two_sided | board.three_sided | board.max_boxes | board.min_boxes == all_boxes
+
+    # The net score (own boxes - opponent's boxes) the player to move gets from the closed components,
+    # when every one of them has to be opened by someone
+    @staticmethod
+    def value(shapes):
+        # assert types
+        assert isinstance(shapes, tuple), "Wrong parameter type"
+
+        if not shapes:
+            return 0
+        if shapes in Endgame_Solver.values:
+            return Endgame_Solver.values[shapes]
+
+        best = None
+        for index, shape in enumerate(shapes):
+            # the same shape twice gives the same value
+            if index and shape == shapes[index - 1]:
+                continue
+
+            rest = shapes[:index] + shapes[index + 1:]
+            value = -Endgame_Solver.controller_value(shape, Endgame_Solver.value(rest))
+
+            if best is None or value > best:
+                best = value
+
+        Endgame_Solver.values[shapes] = best
+        return best
+
+    # The net score of the opponent after the player to move opens the component (in the best way)
+    # rest_value -> the value of the other components, for whoever has to open one of them next
+    @staticmethod
+    def controller_value(shape, rest_value):
+        kind, length = shape
+
+        # take everything, then open one of the other components
+        take_all = length + rest_value
+
+        if kind == "loop":
+            # take all but 4 and leave them with two double-crosses, keeping control
+            return max(take_all, length - 8 - rest_value)
+        if length >= 3:
+            # take all but 2 and leave them with a double-cross, keeping control
+            return max(take_all, length - 4 - rest_value)
+        # 1 box, or 2 boxes opened in the middle (nothing to leave)
+        return take_all
+
+    # Returns the (i, j, direction) move to play
+    @staticmethod
+    def get_move(board):
+        structure = board.analyze()
+
+        opened = [component for component in structure.components if component.capturable]
+        closed = [component for component in structure.components if not component.capturable]
+        rest_value = Endgame_Solver.value(Endgame_Solver.shapes(closed))
+
+        if not opened:
+            return Endgame_Solver.opening_move(board, closed)
+
+        # the boxes that can be declined, keeping control
+        declinable = []
+        for component in opened:
+            edge = Endgame_Solver.declining_edge(board, component)
+            if edge is not None:
+                declinable.append((len(component), component, edge))
+
+        # take every box that can't be declined first
+        for component in opened:
+            if not any(component is other for _, other, _ in declinable):
+                return Endgame_Solver.capture(board, component)
+
+        # then the biggest of the declinable ones, keeping the smallest for last
+        declinable.sort(key=lambda item: item[0])
+        if len(declinable) > 1:
+            return Endgame_Solver.capture(board, declinable[-1][1])
+
+        length, component, edge = declinable[0]
+        if -length - rest_value > length + rest_value:
+            return board.layout.moves[edge]
+        return Endgame_Solver.capture(board, component)
+
+    # The shapes of the closed components
+    @staticmethod
+    def shapes(components):
+        return tuple(sorted((component.kind, len(component)) for component in components))
+
+    # Returns the move completing a box of the component
+    @staticmethod
+    def capture(board, component):
+        for box in component.boxes:
+            if board.sides[box] == 3:
+                missing = board.layout.box_masks[box] & ~board.edges
+                return board.layout.moves[missing.bit_length() - 1]
+
+    # Returns the edge leaving the rest of an opened component to the opponent with a double-cross
+    # or None if the component isn't in that shape:
+    # 2 boxes of a chain (the first capturable, the second ending in the ground)
+    # or 4 boxes of an opened loop (both ends capturable)
+    @staticmethod
+    def declining_edge(board, component):
+        layout = board.layout
+        boxes = component.boxes
+        sides = [board.sides[box] for box in boxes]
+
+        if len(boxes) == 2 and sorted(sides) == [2, 3]:
+            first, second = boxes if sides[0] == 3 else boxes[::-1]
+            for edge in layout.box_edges[second]:
+                # the free edge of the second box going to the ground
+                if not board.edges >> edge & 1 and layout.edge_boxes[edge] == (second,):
+                    return edge
+
+        if len(boxes) == 4 and sides == [3, 2, 2, 3]:
+            # the edge between the two middle boxes
+            return Endgame_Solver.shared_edge(board, boxes[1], boxes[2])
+        return None
+
+    # Returns the free edge between two boxes
+    @staticmethod
+    def shared_edge(board, first, second):
+        for edge in board.layout.box_edges[first]:
+            if second in board.layout.edge_boxes[edge] and not board.edges >> edge & 1:
+                return edge
+        return None
+
+    # Returns the move opening the component that costs the least
+    @staticmethod
+    def opening_move(board, closed):
+        layout = board.layout
+
+        best = None
+        for component in closed:
+            rest = [other for other in closed if other is not component]
+            cost = Endgame_Solver.controller_value((component.kind, len(component)),
+                                                   Endgame_Solver.value(Endgame_Solver.shapes(rest)))
+            if best is None or cost < best[0]:
+                best = (cost, component)
+
+        component = best[1]
+        boxes = component.boxes
+
+        if component.kind == "chain" and len(boxes) == 2:
+            # between the two boxes, so there is no double-cross to leave
+            edge = Endgame_Solver.shared_edge(board, boxes[0], boxes[1])
+        elif component.kind == "chain":
+            # at one end, from the ground
+            edge = next(edge for edge in layout.box_edges[boxes[0]]
+                        if not board.edges >> edge & 1 and layout.edge_boxes[edge] == (boxes[0],))
+        else:
+            edge = Endgame_Solver.shared_edge(board, boxes[0], boxes[1])
+        return layout.moves[edge]
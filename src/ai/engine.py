@@ -0,0 +1,152 @@
+import time
+from .alpha_beta import Alpha_Beta
+from .endgame import Endgame_Solver
+from .ida_star import Ida_Star
+from .lazy_smp import Lazy_Smp
+from .mcts import Mcts
+from .opening_book import Opening_Book
+from .parallel_search import Parallel_Search
+from .perfect_solver import Perfect_Solver
+from .search_stats import Search_Stats
+from ..misc.enums import Algorithm, Difficulty, Parallel
+
+
+# Chooses the moves of the computer, without any input or display
+# The game uses it for its computer player, the arena plays two of them against each other
+class Engine:
+    depths = {
+    #   (n, 2)      (n, 3)      (n, 4)      (n, 5)     (n, 6)     (n, 7)
+        (2, 2):  0, (2, 3):  7, (2, 4): 10, (2, 5): 7, (2, 6): 6, (2, 7): 6,  # (2, m)
+        (3, 2):  7, (3, 3):  7, (3, 4):  6, (3, 5): 5, (3, 6): 5, (3, 7): 4,  # (3, m)
+        (4, 2): 10, (4, 3):  6, (4, 4):  5, (4, 5): 5, (4, 6): 4, (4, 7): 4,  # (4, m)
+        (5, 2):  7, (5, 3):  5, (5, 4):  5, (5, 5): 4, (5, 6): 4, (5, 7): 3,  # (5, m)
+        (6, 2):  6, (6, 3):  5, (6, 4):  4, (6, 5): 4, (6, 6): 3, (6, 7): 3,  # (6, m)
+        (7, 2):  6, (7, 3):  4, (7, 4):  4, (7, 5): 3, (7, 6): 3, (7, 7): 2,  # (7, m)
+    }
+
+    # Iterations of MCTS per move for the easy and medium ai, the hard one searches for time_limit seconds
+    mcts_iterations = {"Easy": 100, "Medium": 1000}
+
+    # Seconds per move of the game, the depths are calibrated for it (python -m src.ai.calibrate)
+    time_limit = 2.0
+
+    # With a time limit, the hard Alpha-Beta searches as deep as the time allows instead of using depths,
+    # unless the depths were calibrated (then they are the most it searches, the time limit still applies)
+    # Without use_tables, the perfect solver, the opening book and the tablebases are left out
+    def __init__(self, algorithm=Algorithm.ALPHA_BETA, difficulty=Difficulty.HARD, time_limit=None, node_limit=None,
+                 workers=1, parallel=Parallel.ROOT_SPLIT, mcts_iterations=None, depths=None, use_tables=True,
+                 calibrated=False):
+        # assert types
+        assert isinstance(algorithm, Algorithm), "Wrong parameter type"
+        assert isinstance(difficulty, Difficulty), "Wrong parameter type"
+        assert time_limit is None or isinstance(time_limit, (int, float)), "Wrong parameter type"
+        assert node_limit is None or isinstance(node_limit, int), "Wrong parameter type"
+        assert isinstance(workers, int), "Wrong parameter type"
+        assert isinstance(parallel, Parallel), "Wrong parameter type"
+        assert isinstance(use_tables, bool), "Wrong parameter type"
+        assert isinstance(calibrated, bool), "Wrong parameter type"
+
+        # assert values
+        assert workers >= 1, "Wrong parameter"
+
+        self.algorithm = algorithm
+        self.difficulty = difficulty
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.workers = workers
+        self.parallel = parallel
+        self.mcts_iterations = Engine.mcts_iterations if mcts_iterations is None else mcts_iterations
+        self.depths = Engine.depths if depths is None else depths
+        self.use_tables = use_tables
+        self.calibrated = calibrated
+
+        # What the search of the last move did
+        self.stats = Search_Stats()
+
+    def __str__(self):
+        return f"{self.algorithm} ({self.difficulty})"
+
+    # Stops the processes of the parallel searches and frees their shared memory
+    @staticmethod
+    def shutdown():
+        Parallel_Search.shutdown()
+        Lazy_Smp.shutdown()
+        Mcts.shutdown()
+
+    # The depth of the searches on the board
+    def get_depth(self, board):
+        depth = self.depths[(board.layout.no_lines, board.layout.no_columns)]
+
+        if str(self.difficulty) == "Medium":
+            depth = depth // 2
+        elif str(self.difficulty) == "Easy":
+            depth = 1
+        elif self.algorithm == Algorithm.ALPHA_BETA and self.time_limit is not None and not self.calibrated:
+            depth = board.count_possible_moves()
+        return depth
+
+    # Returns the (i, j, direction) move of the player to move, or None if the algorithm can't play
+    # The board is left as it was, what the search did is kept in stats
+    def get_move(self, board):
+        start = time.perf_counter()
+        move, self.stats = self.search(board)
+        self.stats.seconds = time.perf_counter() - start
+        return move
+
+    # Returns (the move, the statistics of the search that chose it)
+    def search(self, board):
+        difficulty = str(self.difficulty)
+        depth = self.get_depth(board)
+
+        # the searches read their settings from their classes
+        Alpha_Beta.difficulty = difficulty
+        Alpha_Beta.use_tablebase = self.use_tables
+        Ida_Star.difficulty = difficulty
+        Ida_Star.computer_symbol = board.current_player
+
+        # small boards are solved completely, the hard ai plays them perfectly
+        values = Perfect_Solver.get(board.layout) if difficulty == "Hard" and self.use_tables else None
+        if values is not None:
+            return Perfect_Solver.get_move(board, values), Search_Stats("Perfect solver")
+
+        # the first moves of the hard ai come from the opening book, when it knows the position
+        book = Opening_Book.get(board.layout) if difficulty == "Hard" and self.use_tables else None
+        book_move = book.get_move(board) if book is not None else None
+        if book_move is not None:
+            return book_move, Search_Stats("Opening book")
+
+        # once every move gives boxes away, the rest of the game is solved exactly by the hard ai
+        # (like the other exact tables, the easy and medium ai keep their depth caps)
+        if difficulty == "Hard" and Endgame_Solver.applies(board):
+            return Endgame_Solver.get_move(board), Search_Stats("Endgame solver")
+
+        if self.algorithm == Algorithm.IDA_STAR:
+            move = Ida_Star.get_move(board, depth)
+            return move, Ida_Star.stats
+
+        if self.algorithm == Algorithm.MCTS:
+            iterations = self.mcts_iterations.get(difficulty)
+            time_limit = self.time_limit if iterations is None else None
+            if iterations is None and time_limit is None:
+                iterations = 10 * self.mcts_iterations["Medium"]
+
+            move = Mcts.get_move(board, time_limit, iterations, self.workers)
+            return move, Mcts.stats
+
+        if self.algorithm == Algorithm.ALPHA_BETA:
+            if self.workers > 1 and self.parallel == Parallel.LAZY_SMP:
+                move = Lazy_Smp.get_move(board, depth, self.workers, self.time_limit, self.node_limit)
+                stats = Lazy_Smp.stats
+            elif self.workers > 1:
+                move = Parallel_Search.get_move(board, depth, self.workers, self.time_limit, self.node_limit)
+                stats = Parallel_Search.stats
+            else:
+                move = Alpha_Beta.get_move(board, depth, self.time_limit, self.node_limit)
+                stats = Alpha_Beta.stats
+
+            if move is None:
+                move = Alpha_Beta.get_move(board, 1)
+                stats = Alpha_Beta.stats
+            return move, stats
+
+        return None, Search_Stats(str(self.algorithm))
@@ -1,4 +1,5 @@
-from copy import deepcopy
+import time
+from .search_stats import Search_Stats
 from .state import State
 
 
@@ -6,23 +7,40 @@ class Ida_Star:
     difficulty = "Medium"
     computer_symbol = 'O'
 
+    # The board of the current search, in the position of the state being expanded
+    board = None
+
+    # Position hash -> (depth, limit - g, bound - g, depth returned) of the subtrees proven to go over the limit
+    # A subtree searched again to the same depth, with at least the same limit - g, expands the same nodes up to
+    # the same frontier while g + bound is over the limit, so it returns the same bound without being searched
+    # (in a later iteration with a bigger limit or when the position is reached by other moves)
+    # With a smaller limit - g, nodes inside the stored frontier could become the frontier, so it is searched
+    table = {}
+
+    # Statistics of the last search
+    nodes = 0
+    cutoffs = 0
+    value = 0  # f of the best state found
+    stats = Search_Stats("IDA*")  # what the last search did, its iterations are the bounds
+
     # Checks if the current state is the final state
     @staticmethod
     def final_state(state):
         # assert types
         assert isinstance(state, State), "Wrong parameter type"
 
-        return state.board.is_finished()
+        return Ida_Star.board.is_finished()
 
-    # Gets the successors of the current state
+    # Gets the successors of the current state, one at a time
     @staticmethod
     def successors(state):
         # assert types
         assert isinstance(state, State), "Wrong parameter type"
 
-        return state.find_successors(Ida_Star.difficulty, Ida_Star.computer_symbol)
+        return state.find_successors(Ida_Star.board, Ida_Star.difficulty, Ida_Star.computer_symbol)
 
     # Iterative Deepening A* algorithm with depth limit
+    # The search makes and undoes the moves on a single copy of the board
     @staticmethod
     def ida_star(game_board, depth):
         # assert types
@@ -30,29 +48,71 @@ class Ida_Star:
 
         def expand(current_state, limit, depth):
             if current_state.f > limit:
+                stats.leaf(len(current_state.path))
                 return current_state, current_state.f, depth
             if depth == 0:
+                stats.leaf(len(current_state.path))
                 return current_state, current_state.f, 0
             if Ida_Star.final_state(current_state):
+                stats.leaf(len(current_state.path))
                 return current_state, float('inf'), 0
-            successors = Ida_Star.successors(current_state)
-            if len(successors) == 0:
+
+            # a subtree known to go over the limit returns the same bound, its moves don't matter
+            key = Ida_Star.board.hash
+            entry = Ida_Star.table.get(key)
+            stats.probes += 1
+            if entry is not None and entry[0] == depth and entry[1] <= limit - current_state.g \
+               and current_state.g + entry[2] > limit:
+                stats.hits += 1
+                Ida_Star.cutoffs += 1
+                return current_state, current_state.g + entry[2], entry[3]
+
+            Ida_Star.nodes += 1
+            minim = None
+            for successor in Ida_Star.successors(current_state):
+                result = expand(successor, limit, depth - 1)
+                if minim is None or result[1] < minim[1]:
+                    minim = result
+
+            if minim is None:
                 return current_state, float('inf'), 0
-            minim = min([expand(succ, limit, depth - 1) for succ in successors], key=lambda s: s[1])
+
+            if minim[1] > limit:
+                Ida_Star.table[key] = (depth, limit - current_state.g, minim[1] - current_state.g, minim[2])
             return minim
 
-        starting_state = State(game_board)
-        limit = starting_state.estimate_h(Ida_Star.computer_symbol)
+        Ida_Star.board = game_board.copy()
+
+        # the bounds depend on the estimation, which depends on the computer's symbol and the difficulty
+        Ida_Star.table = {}
+        Ida_Star.nodes = Ida_Star.cutoffs = 0
+        Ida_Star.stats = stats = Search_Stats("IDA*")
+        start = time.perf_counter()
+
+        starting_state = State()
+        limit = State.estimate_h(Ida_Star.board, Ida_Star.computer_symbol)
         state = starting_state
         while limit != float('inf') and depth != 0:
+            iteration_limit = limit
             state, limit, depth = expand(starting_state, limit, depth)
+            stats.iterations.append((iteration_limit, Ida_Star.nodes, time.perf_counter() - start))
+
+        Ida_Star.board = None
+        stats.nodes = Ida_Star.nodes
+        stats.seconds = time.perf_counter() - start
         return state
 
-    # Gets the best move for the computer, returning the first state after the root
+    # Gets the best move for the computer, the first move of the best path, as (i, j, direction)
+    # The bound of the last iteration is kept in Ida_Star.value
     @staticmethod
     def get_move(game_board, depth):
         # assert types
         assert isinstance(depth, int), "Wrong parameter type"
 
         best_state = Ida_Star.ida_star(game_board, depth)
-        return best_state.path_to_root()[1].board.boxes
+        Ida_Star.value = best_state.f
+
+        # without any iteration (no depth) there is no path, any move will do
+        if not best_state.path:
+            return game_board.get_possible_moves()[0]
+        return best_state.path[0]
@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .alpha_beta import Alpha_Beta
+from .search_stats import Search_Stats
+from .shared_table import Shared_Table
+
+
+# Lazy SMP: every process runs the whole iterative deepening Alpha-Beta on the same root
+# They only share the transposition table, so what one process finds the others don't have to search again
+# The processes try the moves in different orders (a different shuffle of the quiet moves each)
+# and every second one starts one move deeper, so they don't all search the same nodes at the same time
+class Lazy_Smp:
+    # The pool of processes and their shared table, kept between the moves of a match
+    executor = None
+    workers = 0
+    table = None
+    table_size = 1 << 18
+
+    # The difficulty and board layout the shared table was filled for
+    table_context = None
+
+    # Counts the searches, so every search gets new move orders
+    searches = 0
+    # The depth of the deepest iteration completed by the last search
+    completed_depth = 0
+    # What the last search did, in all the processes
+    stats = Search_Stats("Alpha-Beta (Lazy SMP)")
+
+    # Returns a pool with the given number of processes, starting a new one (and a new table) if needed
+    @staticmethod
+    def get_executor(workers):
+        # assert types
+        assert isinstance(workers, int), "Wrong parameter type"
+
+        # assert values
+        assert workers >= 1, "Wrong parameter"
+
+        if Lazy_Smp.executor is None or Lazy_Smp.workers != workers:
+            Lazy_Smp.shutdown()
+            Lazy_Smp.table = Shared_Table(Lazy_Smp.table_size)
+            Lazy_Smp.executor = ProcessPoolExecutor(max_workers=workers,
+                                                    initializer=Lazy_Smp.init_worker,
+                                                    initargs=(Lazy_Smp.table.name,))
+            Lazy_Smp.workers = workers
+        return Lazy_Smp.executor
+
+    # Stops the processes and frees the shared table
+    @staticmethod
+    def shutdown():
+        if Lazy_Smp.executor is not None:
+            Lazy_Smp.executor.shutdown(cancel_futures=True)
+        if Lazy_Smp.table is not None:
+            Lazy_Smp.table.close()
+            Lazy_Smp.table.unlink()
+
+        Lazy_Smp.executor = None
+        Lazy_Smp.workers = 0
+        Lazy_Smp.table = None
+        Lazy_Smp.table_context = None
+
+    # Runs once in every worker, when it starts: the searches of the worker use the shared table
+    @staticmethod
+    def init_worker(table_name):
+        Alpha_Beta.table = Shared_Table(name=table_name)
+
+    # The search of one worker
+    # Returns (the depth of the last completed iteration, its best move, the statistics of the search)
+    @staticmethod
+    def search(board, depth, index, seed, difficulty, use_tablebase, time_limit, node_limit):
+        # the board size and the settings live on the classes, which start with the defaults in a new process
+        board_class = type(board)
+        board_class.no_lines, board_class.no_columns = board.layout.no_lines, board.layout.no_columns
+        Alpha_Beta.difficulty = difficulty
+        Alpha_Beta.use_tablebase = use_tablebase
+
+        # the main process clears the shared table when needed, the workers must not
+        Alpha_Beta.table_context = Alpha_Beta.get_context(board.layout)
+
+        # a different order of the quiet moves in every worker, the odd ones start deeper
+        board_class.seed(seed)
+        move = Alpha_Beta.get_move(board, depth, time_limit, node_limit, 1 + index % 2)
+        return Alpha_Beta.completed_depth, move, Alpha_Beta.stats
+
+    # Searches with the given number of processes until the budget runs out
+    # Returns the move of the worker that completed the deepest iteration (the first one on ties)
+    @staticmethod
+    def get_move(game_board, depth, workers, time_limit=None, node_limit=None):
+        # assert types
+        assert isinstance(depth, int), "Wrong parameter type"
+        assert isinstance(workers, int), "Wrong parameter type"
+        assert time_limit is None or isinstance(time_limit, (int, float)), "Wrong parameter type"
+        assert node_limit is None or isinstance(node_limit, int), "Wrong parameter type"
+
+        start = time.perf_counter()
+        executor = Lazy_Smp.get_executor(workers)
+
+        # the stored values depend on the estimation, the tablebase and the board size
+        context = Alpha_Beta.get_context(game_board.layout)
+        if Lazy_Smp.table_context != context:
+            Lazy_Smp.table.clear()
+            Lazy_Smp.table_context = context
+
+        Lazy_Smp.searches += 1
+        futures = [executor.submit(Lazy_Smp.search, game_board, depth, index, Lazy_Smp.searches * workers + index,
+                                   Alpha_Beta.difficulty, Alpha_Beta.use_tablebase, time_limit, node_limit)
+                   for index in range(workers)]
+
+        best_depth, best_move = -1, None
+        Lazy_Smp.stats = Search_Stats("Alpha-Beta (Lazy SMP)")
+        for future in futures:
+            completed_depth, move, stats = future.result()
+            Lazy_Smp.stats.add(stats)
+            if move is not None and completed_depth > best_depth:
+                best_depth, best_move = completed_depth, move
+
+                # the iterations of the worker whose move is played
+                Lazy_Smp.stats.iterations = stats.iterations
+
+        Lazy_Smp.completed_depth = best_depth
+        Lazy_Smp.stats.seconds = time.perf_counter() - start
+        return best_move
@@ -0,0 +1,225 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from .search_stats import Search_Stats
+
+
+class Node:
+    def __init__(self, edge, parent, player, untried, key):
+        self.edge = edge  # the edge drawn to get here (None for the root)
+        self.parent = parent
+        self.player = player  # who drew it, the wins are counted for them
+        self.untried = untried  # the edges not expanded yet
+        self.key = key  # the hash of the board, to find the node again when the tree is reused
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+
+# Monte Carlo Tree Search (UCT)
+# Every iteration walks down the tree by the upper confidence bound, expands one new node,
+# plays the game out with a capture-aware policy and counts the result in every node of the path
+# The tree is kept between moves, the search continues from the node of the new position
+class Mcts:
+    # Weight of the exploration in the upper confidence bound
+    exploration = 1.4
+
+    # How far below the old root the new position is looked for (the moves of both players, with the captures)
+    reuse_depth = 6
+
+    rng = Random()
+
+    # The tree of the last search
+    root = None
+
+    # Statistics of the last search (the nodes are the nodes added to the tree, the leaves the playouts)
+    iterations = 0
+    stats = Search_Stats("MCTS")
+
+    # The pool of processes for root parallel searches, kept between the moves of a match
+    executor = None
+    workers = 0
+
+    # Returns the (i, j, direction) move visited the most by the search
+    # With more workers, every task searches a new tree of its own and the visits of the root moves are added up
+    # (a process can run several tasks, a tree kept from another task would count its visits again)
+    @staticmethod
+    def get_move(game_board, time_limit=None, iterations=None, workers=1):
+        # assert types
+        assert time_limit is None or isinstance(time_limit, (int, float)), "Wrong parameter type"
+        assert iterations is None or isinstance(iterations, int), "Wrong parameter type"
+        assert isinstance(workers, int), "Wrong parameter type"
+
+        # assert values
+        assert time_limit is not None or iterations is not None, "Wrong parameter"
+
+        if workers > 1:
+            executor = Mcts.get_executor(workers)
+            seed = Mcts.rng.getrandbits(32)
+            futures = [executor.submit(Mcts.search, game_board, time_limit, iterations, seed + index, False)
+                       for index in range(workers)]
+
+            visits = {}
+            Mcts.stats = Search_Stats("MCTS")
+            for future in futures:
+                root_visits, worker_stats = future.result()
+                Mcts.stats.add(worker_stats)
+                for edge, count in root_visits.items():
+                    visits[edge] = visits.get(edge, 0) + count
+        else:
+            visits, Mcts.stats = Mcts.search(game_board, time_limit, iterations)
+        Mcts.iterations = Mcts.stats.leaves
+
+        best_edge = max(visits, key=lambda edge: visits[edge])
+        return game_board.layout.moves[best_edge]
+
+    # Returns a pool with the given number of processes, starting a new one if needed
+    @staticmethod
+    def get_executor(workers):
+        if Mcts.executor is None or Mcts.workers != workers:
+            Mcts.shutdown()
+            Mcts.executor = ProcessPoolExecutor(max_workers=workers)
+            Mcts.workers = workers
+        return Mcts.executor
+
+    # Stops the processes
+    @staticmethod
+    def shutdown():
+        if Mcts.executor is not None:
+            Mcts.executor.shutdown(cancel_futures=True)
+        Mcts.executor = None
+        Mcts.workers = 0
+
+    # Searches from the board until the time or the iterations run out
+    # reuse -> continues the tree of the last search, if it holds the position
+    # Returns (edge -> visits of the root moves, statistics of the search)
+    @staticmethod
+    def search(game_board, time_limit=None, iterations=None, seed=None, reuse=True):
+        if seed is not None:
+            Mcts.rng.seed(seed)
+
+        # the board size lives on the class, which starts with the defaults in a new process
+        board_class = type(game_board)
+        board_class.no_lines, board_class.no_columns = game_board.layout.no_lines, game_board.layout.no_columns
+
+        board = game_board.copy()
+        root = Mcts.find_root(board) if reuse else Mcts.new_root(board)
+        Mcts.root = root
+
+        stats = Search_Stats("MCTS")
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        count = 0
+        # the first iteration always runs, so the root has a visited move even with no budget left
+        while count == 0 or iterations is None or count < iterations:
+            if count and deadline is not None and not count & 15 and time.perf_counter() > deadline:
+                break
+
+            stats.leaf(Mcts.iterate(board, root))
+            count += 1
+
+        stats.nodes = count
+        stats.seconds = time.perf_counter() - start
+        return {child.edge: child.visits for child in root.children}, stats
+
+    # Returns the node of the board in the tree of the last search, or a new root
+    @staticmethod
+    def find_root(board):
+        old = Mcts.root
+        if old is not None:
+            nodes = [old]
+            for _ in range(Mcts.reuse_depth + 1):
+                for node in nodes:
+                    if node.key == board.hash:
+                        # the rest of the tree can go
+                        node.parent = None
+                        return node
+                nodes = [child for node in nodes for child in node.children]
+
+        return Mcts.new_root(board)
+
+    # A tree with only the node of the board
+    @staticmethod
+    def new_root(board):
+        return Node(None, None, None, Mcts.shuffled_edges(board), board.hash)
+
+    # The free edges of the board, in a random order
+    @staticmethod
+    def shuffled_edges(board):
+        edges = list(board.generate_edges())
+        Mcts.rng.shuffle(edges)
+        return edges
+
+    # One iteration: selection, expansion, playout and backpropagation
+    # Returns the ply of the node the playout started from
+    @staticmethod
+    def iterate(board, root):
+        node = root
+        drawn = []  # the edges drawn on the board, to undo them at the end
+
+        # go down while every move of the node is expanded
+        while not node.untried and node.children:
+            node = Mcts.select(node)
+            Mcts.draw(board, node.edge, drawn)
+
+        # add one more move to the tree
+        if node.untried:
+            player = board.current_player
+            edge = node.untried.pop()
+            Mcts.draw(board, edge, drawn)
+
+            child = Node(edge, node, player, Mcts.shuffled_edges(board), board.hash)
+            node.children.append(child)
+            node = child
+
+        ply = len(drawn)
+
+        # play the game to the end
+        while not board.is_finished():
+            Mcts.draw(board, Mcts.playout_edge(board), drawn)
+
+        difference = board.max_score - board.min_score
+
+        # undo the playout and the moves of the tree
+        for edge, player in reversed(drawn):
+            board.undo_edge(edge)
+            board.current_player = player
+
+        # count the result for the player who made the move into every node
+        while node is not None:
+            node.visits += 1
+            if node.player is not None:
+                if difference == 0:
+                    node.wins += 0.5
+                elif (difference > 0) == (node.player == board.max_symbol):
+                    node.wins += 1
+            node = node.parent
+        return ply
+
+    # Returns the child with the biggest upper confidence bound
+    @staticmethod
+    def select(node):
+        log_visits = math.log(node.visits)
+        return max(node.children,
+                   key=lambda child: child.wins / child.visits +
+                   Mcts.exploration * math.sqrt(log_visits / child.visits))
+
+    # Draws the edge, switching the player if no box got completed
+    @staticmethod
+    def draw(board, edge, drawn):
+        drawn.append((edge, board.current_player))
+        board.make_edge(edge)
+        if not board.completed_box:
+            board.current_player = board.get_opponent()
+
+    # The playout policy: complete a box if possible, else draw a safe edge, else any edge
+    @staticmethod
+    def playout_edge(board):
+        capture = board.almost_completed_edges()
+        if capture:
+            return capture[0]
+
+        edges = list(board.generate_edges())
+        safe = [edge for edge in edges if board.is_safe_edge(edge)]
+        return Mcts.rng.choice(safe or edges)
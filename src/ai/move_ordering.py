@@ -0,0 +1,56 @@
+class Move_Ordering:
+    no_killers = 2  # killer moves remembered per ply
+
+    def __init__(self):
+        self.killers = {}  # ply -> the last moves that caused a cutoff at that ply
+        self.history = {}  # edge -> how much it caused cutoffs, weighted by depth
+
+    # Forgets the killers and halves the history, between two searches
+    def age(self):
+        self.killers = {}
+        self.history = {edge: score // 2 for edge, score in self.history.items() if score > 1}
+
+    # Records a move that caused a cutoff
+    def cutoff(self, board, move, ply, depth):
+        # assert types
+        assert isinstance(ply, int), "Wrong parameter type"
+        assert isinstance(depth, int), "Wrong parameter type"
+
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[Move_Ordering.no_killers:]
+
+        edge = board.layout.edge_index[move]
+        self.history[edge] = self.history.get(edge, 0) + depth * depth
+
+    # Yields the possible moves, the most promising first:
+    # 1. moves completing a box
+    # 2. the best move found for the position in an earlier search (principal variation / table move)
+    # 3. the killer moves of the ply
+    # 4. the rest, those not giving a third side to a box first, then by history
+    # The first stages are lazy, so a cutoff skips the work of the last one
+    def order(self, board, ply, table_move=None):
+        layout = board.layout
+        tried = 0  # bitset of the edges already yielded
+
+        for edge in board.almost_completed_edges():
+            if not tried >> edge & 1:
+                tried |= 1 << edge
+                yield layout.moves[edge]
+
+        for move in [table_move] + self.killers.get(ply, []):
+            if move is None:
+                continue
+
+            edge = layout.edge_index[move]
+            if not tried >> edge & 1 and not board.edges >> edge & 1:
+                tried |= 1 << edge
+                yield move
+
+        history = self.history
+        rest = [edge for edge in board.generate_edges() if not tried >> edge & 1]
+        rest.sort(key=lambda edge: (not board.is_safe_edge(edge), -history.get(edge, 0)))
+
+        for edge in rest:
+            yield layout.moves[edge]
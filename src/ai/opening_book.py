@@ -0,0 +1,129 @@
+from os import path
+from random import Random
+from .alpha_beta import Alpha_Beta
+from .tablebase import Tablebase
+
+
+# The moves of deep searches of the first positions of a game, computed offline
+#
+# Positions are keyed by their canonical key (Board.canonical), so the symmetric ones share a move
+# The move is stored for the canonical position and turned back with the inverse transform when played
+#
+# File: a header, then one record per position
+#   header -> b"DBOB", number of dots per line, per column, the bytes of a key
+#   record -> the canonical key (big endian, key bytes), the edge to draw in the canonical position (1 byte)
+class Opening_Book:
+    magic = b"DBOB"
+    header_size = 7
+
+    # layout -> its book, or None if there is no file for the size
+    books = {}
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.moves = {}  # canonical key -> edge
+
+        # the biggest key: all the edges, the biggest score difference, O to move
+        no_scores = 2 * layout.no_boxes + 1
+        biggest = (layout.full_mask * no_scores + no_scores - 1) << 1 | 1
+        self.key_bytes = (biggest.bit_length() + 7) // 8
+
+    def __len__(self):
+        return len(self.moves)
+
+    # The file of the given size, next to the tablebases
+    @staticmethod
+    def file_path(no_lines, no_columns):
+        return path.normpath(path.join(Tablebase.table_dir, f"{no_lines}x{no_columns}.book"))
+
+    # Returns the book of the layout, or None if it wasn't built
+    # The file is read the first time a move is asked for, it only has a few hundred positions
+    @staticmethod
+    def get(layout):
+        if layout not in Opening_Book.books:
+            file_path = Opening_Book.file_path(layout.no_lines, layout.no_columns)
+            Opening_Book.books[layout] = Opening_Book.load(layout, file_path) if path.isfile(file_path) else None
+        return Opening_Book.books[layout]
+
+    # Reads a book from the file
+    @staticmethod
+    def load(layout, file_path):
+        book = Opening_Book(layout)
+
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        assert data[:4] == Opening_Book.magic, "Wrong opening book file"
+        assert (data[4], data[5]) == (layout.no_lines, layout.no_columns), "Wrong opening book size"
+
+        key_bytes = data[6]
+        for start in range(Opening_Book.header_size, len(data), key_bytes + 1):
+            key = int.from_bytes(data[start:start + key_bytes], "big")
+            book.moves[key] = data[start + key_bytes]
+        return book
+
+    # Writes the book to the file, sorted by key
+    def save(self, file_path):
+        layout = self.layout
+
+        with open(file_path, "wb") as f:
+            f.write(Opening_Book.magic + bytes([layout.no_lines, layout.no_columns, self.key_bytes]))
+            for key in sorted(self.moves):
+                f.write(key.to_bytes(self.key_bytes, "big") + bytes([self.moves[key]]))
+
+    # Remembers the (i, j, direction) move for the position of the board
+    def add(self, board, move):
+        key, transform = board.canonical()
+        self.moves[key] = self.layout.edge_index[board.transform_move(move, transform)]
+
+    # Returns the (i, j, direction) move of the book for the position of the board, or None
+    def get_move(self, board):
+        key, transform = board.canonical()
+        edge = self.moves.get(key)
+        if edge is None:
+            return None
+
+        move = board.transform_move(self.layout.moves[edge], board.inverse_transform(transform))
+        if board.edges >> self.layout.edge_index[move] & 1:
+            return None
+        return move
+
+    # Fills the book with the moves of self-played games
+    # The first game follows the book on both sides, the others play a random move half of the time
+    # (a safe one if there is any), so the book also knows what to answer to other openings
+    # Every position met in the first plies is searched for time_limit seconds, with the hard estimation
+    def build(self, board, plies, games, time_limit, seed=0):
+        # assert types
+        assert isinstance(plies, int), "Wrong parameter type"
+        assert isinstance(games, int), "Wrong parameter type"
+        assert isinstance(time_limit, (int, float)), "Wrong parameter type"
+
+        rng = Random(seed)
+        difficulty = Alpha_Beta.difficulty
+        Alpha_Beta.difficulty = "Hard"
+
+        # the difficulty of the game comes back even if the build is stopped
+        try:
+            for game in range(games):
+                current = board.copy()
+
+                for _ in range(plies):
+                    if current.is_finished():
+                        break
+
+                    move = self.get_move(current)
+                    if move is None:
+                        move = Alpha_Beta.get_move(current, current.count_possible_moves(), time_limit)
+                        self.add(current, move)
+
+                    if game and rng.random() < 0.5:
+                        edges = [edge for edge in current.generate_edges() if current.is_safe_edge(edge)]
+                        if not edges:
+                            edges = list(current.generate_edges())
+                        move = self.layout.moves[rng.choice(edges)]
+
+                    current.make_move(move[0], move[1], move[2])
+                    if not current.completed_box:
+                        current.current_player = current.get_opponent()
+        finally:
+            Alpha_Beta.difficulty = difficulty
@@ -0,0 +1,190 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value
+from .alpha_beta import Alpha_Beta, Search_Timeout
+from .search_stats import Search_Stats
+
+
+# Alpha-Beta with the root moves split between processes
+#
+# Every worker searches one root move at a time, with its own transposition table and move ordering
+# The best value found so far is shared between the workers, each new root move starts with it as a bound
+# The window is opened by 1 under (or over) the shared value, so a move as good as the best one is still
+# searched exactly, and the first of the equal moves in the root order is chosen, as the serial search does
+class Parallel_Search:
+    # The pool of processes, kept between the moves of a match
+    executor = None
+    workers = 0
+
+    # The best value of the current root, shared by the processes (set in every worker by init_worker)
+    best_value = None
+
+    # What the last search did, in all the processes
+    stats = Search_Stats("Alpha-Beta (root split)")
+
+    # Returns a pool with the given number of processes, starting a new one if needed
+    @staticmethod
+    def get_executor(workers):
+        # assert types
+        assert isinstance(workers, int), "Wrong parameter type"
+
+        # assert values
+        assert workers >= 1, "Wrong parameter"
+
+        if Parallel_Search.executor is None or Parallel_Search.workers != workers:
+            Parallel_Search.shutdown()
+            Parallel_Search.best_value = Value('i', 0)
+            Parallel_Search.executor = ProcessPoolExecutor(max_workers=workers,
+                                                           initializer=Parallel_Search.init_worker,
+                                                           initargs=(Parallel_Search.best_value,))
+            Parallel_Search.workers = workers
+        return Parallel_Search.executor
+
+    # Stops the processes
+    @staticmethod
+    def shutdown():
+        if Parallel_Search.executor is not None:
+            Parallel_Search.executor.shutdown(cancel_futures=True)
+        Parallel_Search.executor = None
+        Parallel_Search.workers = 0
+
+    # Runs once in every worker, when it starts
+    @staticmethod
+    def init_worker(best_value):
+        Parallel_Search.best_value = best_value
+
+    # Searches one root move in a worker
+    # Returns (value, bound, statistics) with the bound of the window the move was searched with
+    # (None, None, None if the time ran out), the value is exact if it is better than the bound
+    # end_time is a time.perf_counter() value, the clock is the same in every process of the machine
+    @staticmethod
+    def search_move(board, move, depth, maximizing_player, difficulty, use_tablebase, end_time, node_limit):
+        # the board size and the settings live on the classes, which start with the defaults in a new process
+        type(board).no_lines, type(board).no_columns = board.layout.no_lines, board.layout.no_columns
+        Alpha_Beta.difficulty = difficulty
+        Alpha_Beta.use_tablebase = use_tablebase
+        Alpha_Beta.tablebase = Alpha_Beta.get_tablebase(board.layout)
+
+        # the table of the worker is kept between the searches, its values depend on the settings
+        context = Alpha_Beta.get_context(board.layout)
+        if Alpha_Beta.table_context != context:
+            Alpha_Beta.table.clear()
+            Alpha_Beta.table_context = context
+
+        initial_alpha = -board.limit - board.get_total_score() - 1
+        initial_beta = board.limit + board.get_total_score() + 1
+
+        # the bound shared by the workers, opened by 1 so the ties are found
+        best_value = Parallel_Search.best_value.value
+        alpha, beta = initial_alpha, initial_beta
+        if maximizing_player and best_value > initial_alpha:
+            alpha = best_value - 1
+        elif not maximizing_player and best_value < initial_beta:
+            beta = best_value + 1
+
+        Alpha_Beta.nodes = 0
+        Alpha_Beta.stats = stats = Search_Stats("Alpha-Beta")
+        Alpha_Beta.table.reset_stats()
+        Alpha_Beta.root_depth = depth
+        Alpha_Beta.deadline = end_time
+        Alpha_Beta.node_limit = node_limit
+
+        board.make_move(move[0], move[1], move[2])
+        if board.completed_box:
+            next_maximizing = maximizing_player
+        else:
+            board.current_player = board.get_opponent()
+            next_maximizing = not maximizing_player
+
+        try:
+            value = Alpha_Beta.alpha_beta(board, depth - 1, alpha, beta, next_maximizing)[0]
+        except Search_Timeout:
+            return None, None, None
+        finally:
+            Alpha_Beta.deadline = Alpha_Beta.node_limit = None
+
+        # share the value with the other workers
+        with Parallel_Search.best_value.get_lock():
+            if maximizing_player and value > Parallel_Search.best_value.value or \
+               not maximizing_player and value < Parallel_Search.best_value.value:
+                Parallel_Search.best_value.value = value
+
+        stats.nodes = Alpha_Beta.nodes
+        stats.read_table(Alpha_Beta.table)
+        return value, alpha if maximizing_player else beta, stats
+
+    # Searches every root move in the workers and returns the best move, or None if the time ran out
+    @staticmethod
+    def search_root(board, moves, depth, workers, end_time, node_limit):
+        executor = Parallel_Search.get_executor(workers)
+        maximizing_player = board.current_player == board.max_symbol
+
+        initial = -board.limit - board.get_total_score() - 1
+        Parallel_Search.best_value.value = initial if maximizing_player else -initial
+
+        def submit(move):
+            return executor.submit(Parallel_Search.search_move, board, move, depth, maximizing_player,
+                                   Alpha_Beta.difficulty, Alpha_Beta.use_tablebase, end_time, node_limit)
+
+        # young brothers wait: the first move (the best one of the last iteration) is searched alone,
+        # the others start with its value as a bound
+        futures = [submit(moves[0])]
+        if futures[0].result()[0] is None:
+            return None
+        futures += [submit(move) for move in moves[1:]]
+
+        best_move, best_value = None, None
+        for move, future in zip(moves, futures):
+            value, bound, stats = future.result()
+            if value is None:
+                for other in futures:
+                    other.cancel()
+                return None
+            Parallel_Search.stats.add(stats)
+
+            # a value not better than the bound of its window only says the move isn't the best
+            exact = value > bound if maximizing_player else value < bound
+            better = best_value is None or (value > best_value if maximizing_player else value < best_value)
+            if exact and better:
+                best_move, best_value = move, value
+        return best_move
+
+    # Searches 1, 2, ..., depth moves ahead with the given number of processes, until the budget runs out
+    # The node limit applies to the search of every root move
+    @staticmethod
+    def get_move(game_board, depth, workers, time_limit=None, node_limit=None):
+        # assert types
+        assert isinstance(depth, int), "Wrong parameter type"
+        assert isinstance(workers, int), "Wrong parameter type"
+        assert time_limit is None or isinstance(time_limit, (int, float)), "Wrong parameter type"
+        assert node_limit is None or isinstance(node_limit, int), "Wrong parameter type"
+
+        start = time.perf_counter()
+        board = game_board.copy()
+        Parallel_Search.stats = stats = Search_Stats("Alpha-Beta (root split)")
+
+        # the root moves in the order of the serial search
+        Alpha_Beta.ordering.age()
+        moves = list(Alpha_Beta.ordering.order(board, 0))
+        depth = min(depth, len(moves))
+
+        best_move = None
+        end_time = None
+        for current_depth in range(1, depth + 1):
+            move = Parallel_Search.search_root(board, moves, current_depth, workers,
+                                               end_time, node_limit if best_move else None)
+            if move is None:
+                break
+            best_move = move
+            stats.iterations.append((current_depth, stats.nodes, time.perf_counter() - start))
+
+            # the best move is searched first in the next iteration
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+            # the first search always finishes, so there is a move to return
+            if time_limit is not None:
+                end_time = start + time_limit
+
+        stats.seconds = time.perf_counter() - start
+        return best_move
@@ -0,0 +1,110 @@
+import numpy as np
+from os import makedirs, path
+from .tablebase import Tablebase
+
+
+# Solves small boards completely, by dynamic programming over all the edge bitsets
+#
+# values[edges] -> the net score (own boxes - opponent's boxes) the player to move gets from the boxes left,
+# if both players play perfectly
+# Drawing an edge only makes the bitset bigger, so the bitsets are solved from the most edges to the fewest,
+# one number of edges (popcount) at a time, every level at once with NumPy
+#
+# The boards are solved offline, with python -m src.ai.build_perfect_solver, never during a match
+class Perfect_Solver:
+    # The most edges a board can have to be solved: the bitsets are 32-bit numbers
+    # (already 2^31 values for the 31 edges of 4x5, 5x5 and the bigger boards can't be solved)
+    max_edges = 32
+
+    # layout -> its values, or None if the board wasn't solved
+    values = {}
+
+    # The file of the given size, next to the tablebases
+    @staticmethod
+    def file_path(no_lines, no_columns):
+        return path.normpath(path.join(Tablebase.table_dir, f"{no_lines}x{no_columns}.npy"))
+
+    # Returns the values of the layout, or None if there is no file for the size
+    # The file is memory-mapped the first time a search asks for it
+    @staticmethod
+    def get(layout):
+        if layout not in Perfect_Solver.values:
+            file_path = Perfect_Solver.file_path(layout.no_lines, layout.no_columns)
+            Perfect_Solver.values[layout] = np.load(file_path, mmap_mode='r') if path.isfile(file_path) else None
+        return Perfect_Solver.values[layout]
+
+    # Solves the layout and saves the values
+    @staticmethod
+    def build(layout, file_path=None):
+        if file_path is None:
+            file_path = Perfect_Solver.file_path(layout.no_lines, layout.no_columns)
+
+        values = Perfect_Solver.solve(layout)
+
+        makedirs(path.dirname(file_path), exist_ok=True)
+        np.save(file_path, values)
+        Perfect_Solver.values[layout] = values
+        return values
+
+    # Returns the values of all the edge bitsets of the layout
+    @staticmethod
+    def solve(layout):
+        # assert values
+        assert layout.no_edges <= Perfect_Solver.max_edges, "Board too big for the perfect solver"
+
+        no_edges = layout.no_edges
+        bitsets = np.arange(1 << no_edges, dtype=np.uint32)
+
+        # the number of edges of every bitset
+        popcount = np.zeros(1 << no_edges, dtype=np.uint8)
+        for edge in range(no_edges):
+            popcount += (bitsets >> edge & 1).astype(np.uint8)
+        del bitsets
+
+        # the full board is worth 0, every other level is solved from the one with an edge more
+        values = np.zeros(1 << no_edges, dtype=np.int8)
+        for level in range(no_edges - 1, -1, -1):
+            edges = np.flatnonzero(popcount == level).astype(np.uint32)
+            values[edges] = Perfect_Solver.solve_level(layout, edges, values)
+        return values
+
+    # The values of the bitsets with the same number of edges
+    @staticmethod
+    def solve_level(layout, edges, values):
+        best = np.full(len(edges), np.iinfo(np.int8).min, dtype=np.int8)
+
+        for edge in range(layout.no_edges):
+            free = (edges >> edge & 1) == 0
+            children = edges[free] | np.uint32(1 << edge)
+
+            # the boxes the edge completes
+            boxes = np.zeros(len(children), dtype=np.int8)
+            for box in layout.edge_boxes[edge]:
+                mask = np.uint32(layout.box_masks[box])
+                boxes += (children & mask) == mask
+
+            # a completed box keeps the turn, otherwise the opponent moves next
+            child_values = values[children]
+            candidates = np.where(boxes > 0, boxes + child_values, -child_values)
+            best[free] = np.maximum(best[free], candidates)
+        return best
+
+    # The net score the player to move gets from the boxes left
+    @staticmethod
+    def value(board, values):
+        return int(values[board.edges])
+
+    # Returns the best (i, j, direction) move, completing a box when that is as good as the rest
+    @staticmethod
+    def get_move(board, values):
+        layout = board.layout
+
+        best, best_edge = None, None
+        for edge in board.generate_edges():
+            child = board.edges | 1 << edge
+            boxes = sum(1 for box in layout.edge_boxes[edge] if board.sides[box] == 3)
+
+            value = boxes + int(values[child]) if boxes else -int(values[child])
+            if best is None or (value, boxes > 0) > best:
+                best, best_edge = (value, boxes > 0), edge
+        return layout.moves[best_edge]
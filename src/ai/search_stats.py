@@ -0,0 +1,104 @@
+# What a search did to choose its move, filled by every engine for every search
+class Search_Stats:
+    def __init__(self, engine=""):
+        # assert types
+        assert isinstance(engine, str), "Wrong parameter type"
+
+        self.engine = engine  # what chose the move (a search, the perfect solver, the opening book, ...)
+        self.nodes = 0  # positions visited
+        self.leaves = 0  # positions evaluated (depth 0, finished games, playouts)
+        self.cutoffs = []  # cutoffs[index] -> the cutoffs caused by the index-th move tried in a position
+        self.max_depth = 0  # the deepest ply reached
+        self.iterations = []  # (depth or bound, nodes so far, seconds so far) of every completed iteration
+        self.probes = 0  # lookups in the cache of the search (transposition table, ...)
+        self.hits = 0
+        self.table_cutoffs = 0  # positions whose stored value was enough, without searching them
+        self.collisions = 0  # lookups of a bucket holding other positions
+        self.fill_rate = 0.0  # the fraction of the transposition table in use at the end of the search
+        self.seconds = 0.0
+
+    # Copies the statistics of the transposition table of the search
+    def read_table(self, table):
+        self.probes, self.hits = table.probes, table.hits
+        self.table_cutoffs, self.collisions = table.cutoffs, table.collisions
+        self.fill_rate = table.fill_rate()
+
+    # Counts a cutoff on the index-th move tried
+    def cutoff(self, index):
+        while len(self.cutoffs) <= index:
+            self.cutoffs.append(0)
+        self.cutoffs[index] += 1
+
+    # Counts a position evaluated at the given ply
+    def leaf(self, ply):
+        self.leaves += 1
+        if ply > self.max_depth:
+            self.max_depth = ply
+
+    # Adds the statistics of another search of the same move (the searches of the other processes)
+    def add(self, other):
+        # assert types
+        assert isinstance(other, Search_Stats), "Wrong parameter type"
+
+        self.nodes += other.nodes
+        self.leaves += other.leaves
+        self.cutoffs += [0] * (len(other.cutoffs) - len(self.cutoffs))
+        for index, count in enumerate(other.cutoffs):
+            self.cutoffs[index] += count
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.probes += other.probes
+        self.hits += other.hits
+        self.table_cutoffs += other.table_cutoffs
+        self.collisions += other.collisions
+        self.fill_rate = max(self.fill_rate, other.fill_rate)
+
+    # The b of a tree with b^d nodes, d being the deepest ply
+    def branching_factor(self):
+        if self.max_depth == 0 or self.nodes == 0:
+            return 0.0
+        return self.nodes ** (1 / self.max_depth)
+
+    # The fraction of the cache lookups that found the position
+    def hit_rate(self):
+        return self.hits / self.probes if self.probes else 0.0
+
+    # The fraction of the cutoffs caused by the first move tried, the better the move order the closer to 1
+    def first_cutoff_rate(self):
+        total = sum(self.cutoffs)
+        return self.cutoffs[0] / total if total else 0.0
+
+    def to_dict(self):
+        return {
+            "engine": self.engine,
+            "nodes": self.nodes,
+            "leaves": self.leaves,
+            "cutoffs": list(self.cutoffs),
+            "max_depth": self.max_depth,
+            "branching_factor": round(self.branching_factor(), 3),
+            "iterations": [[depth, nodes, round(seconds, 6)] for depth, nodes, seconds in self.iterations],
+            "hit_rate": round(self.hit_rate(), 3),
+            "table_cutoffs": self.table_cutoffs,
+            "collisions": self.collisions,
+            "fill_rate": round(self.fill_rate, 3),
+            "seconds": round(self.seconds, 6),
+        }
+
+    def __str__(self):
+        if not self.nodes:
+            return self.engine
+
+        parts = [f"{self.nodes} nodes", f"{self.leaves} leaves", f"depth {self.max_depth}",
+                 f"branching {self.branching_factor():.2f}"]
+        if self.cutoffs:
+            parts.append(f"first move cutoffs {self.first_cutoff_rate():.0%}")
+        if self.probes:
+            parts.append(f"cache hits {self.hit_rate():.0%}")
+        if self.fill_rate:
+            parts += [f"table cutoffs {self.table_cutoffs}", f"collisions {self.collisions}",
+                      f"table filled {self.fill_rate:.1%}"]
+        if self.iterations:
+            parts.append(f"{len(self.iterations)} iterations")
+        return f"{self.engine}: " + ", ".join(parts)
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,138 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+
+# A transposition table in shared memory, read and written by several processes without locks
+# Same interface as Transposition_Table, with the same two entries (depth-preferred, always-replace) per bucket
+#
+# Every entry is two 64-bit words: (key ^ data, data)
+# A process can read an entry while another one writes it and get half of each, the key check then fails
+# (the XOR of the two words only gives back the key if both come from the same store), so it's just a miss
+class Shared_Table:
+    # Bound types of the stored values
+    EXACT = 0
+    LOWER = 1  # the value is at least the stored one (beta cutoff)
+    UPPER = 2  # the value is at most the stored one (no move raised alpha)
+
+    # data = value + value_offset | depth << 16 | bound << 24 | move code << 26 | used
+    value_offset = 1 << 15
+    used_bit = 1 << 34
+    key_mask = (1 << 64) - 1
+
+    # Creates a new table, or attaches to the one with the given name (in another process)
+    def __init__(self, size=1 << 18, name=None):
+        # assert types
+        assert isinstance(size, int), "Wrong parameter type"
+        assert name is None or isinstance(name, str), "Wrong parameter type"
+
+        # assert values
+        assert size >= 2, "Wrong parameter"
+
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size * 16)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+        self.name = self.memory.name
+        self.words = self.memory.buf.cast('Q')
+        self.no_buckets = len(self.words) // 4
+        self.reset_stats()
+
+    # Removes all the entries (for every process) and the statistics (of this process)
+    def clear(self):
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+        self.reset_stats()
+
+    # Resets the statistics of this process, keeping the entries
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.collisions = 0
+        self.stores = 0
+
+    # Stops using the shared memory
+    def close(self):
+        self.words.release()
+        self.memory.close()
+
+    # Frees the shared memory, once every process closed it
+    def unlink(self):
+        self.memory.unlink()
+
+    # The number of entries the table can hold
+    def size(self):
+        return 2 * self.no_buckets
+
+    # The fraction of the entries in use (reads the whole table, in one pass of NumPy)
+    def fill_rate(self):
+        data = np.frombuffer(self.words, dtype=np.uint64)[1::2]
+        used = np.count_nonzero(data & np.uint64(Shared_Table.used_bit))
+        return int(used) / self.size()
+
+    # Statistics of the searches of this process since the last reset
+    def stats(self):
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "cutoffs": self.cutoffs,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "fill_rate": self.fill_rate(),
+        }
+
+    # Packs an entry into a 64-bit word
+    @staticmethod
+    def pack(depth, value, bound, move):
+        if move is None:
+            code = 0
+        else:
+            i, j, direction = move
+            code = 1 + ((i << 3 | j) << 1 | (direction == "down"))
+        return (value + Shared_Table.value_offset) | depth << 16 | bound << 24 | code << 26 | Shared_Table.used_bit
+
+    # Unpacks a 64-bit word into the entry (key, depth, value, bound, move)
+    @staticmethod
+    def unpack(key, data):
+        code = data >> 26 & 255
+        if code:
+            code -= 1
+            move = (code >> 4, code >> 1 & 7, "down" if code & 1 else "right")
+        else:
+            move = None
+        return key, data >> 16 & 255, (data & 0xFFFF) - Shared_Table.value_offset, data >> 24 & 3, move
+
+    # Returns the entry (key, depth, value, bound, move) of the position, or None
+    def probe(self, key):
+        self.probes += 1
+        words = self.words
+        start = 4 * (key % self.no_buckets)
+
+        for index in (start, start + 2):
+            data = words[index + 1]
+            if data & Shared_Table.used_bit and words[index] ^ data == key:
+                self.hits += 1
+                return Shared_Table.unpack(key, data)
+
+        # the bucket holds other positions
+        if words[start + 1] & Shared_Table.used_bit:
+            self.collisions += 1
+        return None
+
+    # Stores the result of a search of the given depth
+    def store(self, key, depth, value, bound, move):
+        self.stores += 1
+        words = self.words
+        start = 4 * (key % self.no_buckets)
+        data = Shared_Table.pack(depth, value, bound, move)
+
+        deep_data = words[start + 1]
+        deep_key = words[start] ^ deep_data
+
+        if not deep_data & Shared_Table.used_bit or deep_key == key or depth >= deep_data >> 16 & 255:
+            if deep_data & Shared_Table.used_bit and deep_key != key:
+                # the replaced entry still gets a chance in the other slot
+                words[start + 2], words[start + 3] = words[start], deep_data
+            words[start], words[start + 1] = key ^ data, data
+        else:
+            words[start + 2], words[start + 3] = key ^ data, data
@@ -0,0 +1,173 @@
+import mmap
+import sys
+from itertools import combinations
+from os import makedirs, path
+
+
+# Exact values of the positions with few edges left, computed offline and read from a file
+#
+# The value of a position only depends on the edges drawn: it is the net score (own boxes - opponent's boxes)
+# the player to move gets from the boxes left, if both players play perfectly
+#
+# File: a header, then one record per position, sorted by key
+#   header -> b"DBTB", number of dots per line, per column, the most free edges, the bytes of a key
+#   record -> the canonical edge bitset (big endian, key bytes), the value (1 signed byte)
+class Tablebase:
+    magic = b"DBTB"
+    header_size = 8
+
+    # Where the tables are
+    if getattr(sys, 'frozen', False):  # if the application is bundled by PyInstaller
+        table_dir = path.join(sys._MEIPASS, 'tables')
+    else:
+        table_dir = path.join(path.dirname(__file__), '..', '..', 'tables')
+
+    # layout -> its tablebase, or None if there is no file for the size
+    tablebases = {}
+
+    def __init__(self, file_path):
+        # assert types
+        assert isinstance(file_path, str), "Wrong parameter type"
+
+        # the records stay on disk, the operating system pages in the ones the searches read
+        with open(file_path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = self.data[:Tablebase.header_size]
+        assert header[:4] == Tablebase.magic, "Wrong tablebase file"
+
+        self.no_lines = header[4]
+        self.no_columns = header[5]
+        self.max_free = header[6]
+        self.key_bytes = header[7]
+        self.record_size = self.key_bytes + 1
+        self.no_records = (len(self.data) - Tablebase.header_size) // self.record_size
+
+    # The file of the given size
+    @staticmethod
+    def file_path(no_lines, no_columns):
+        return path.normpath(path.join(Tablebase.table_dir, f"{no_lines}x{no_columns}.tb"))
+
+    # Returns the tablebase of the layout, or None if it wasn't generated
+    # The file is opened the first time a search asks for it
+    @staticmethod
+    def get(layout):
+        if layout not in Tablebase.tablebases:
+            file_path = Tablebase.file_path(layout.no_lines, layout.no_columns)
+            Tablebase.tablebases[layout] = Tablebase(file_path) if path.isfile(file_path) else None
+        return Tablebase.tablebases[layout]
+
+    # Closes the open files, so they can be generated again
+    @staticmethod
+    def close_all():
+        for tablebase in Tablebase.tablebases.values():
+            if tablebase is not None:
+                tablebase.data.close()
+        Tablebase.tablebases = {}
+
+    # Returns the value of the position for the player to move, or None if it isn't in the table
+    def probe(self, board):
+        if board.count_possible_moves() > self.max_free:
+            return None
+        return self.lookup(board.canonical_edges()[0])
+
+    # Binary search of a canonical edge bitset among the records
+    def lookup(self, edges):
+        key = edges.to_bytes(self.key_bytes, "big")
+        data, size = self.data, self.record_size
+
+        low, high = 0, self.no_records
+        while low < high:
+            middle = (low + high) // 2
+            start = Tablebase.header_size + middle * size
+            record = data[start:start + self.key_bytes]
+
+            if record < key:
+                low = middle + 1
+            elif record > key:
+                high = middle
+            else:
+                return int.from_bytes(data[start + self.key_bytes:start + size], "big", signed=True)
+        return None
+
+    # Computes the values of all the positions with at most max_free edges left and writes them to a file
+    # Returns the number of positions written
+    @staticmethod
+    def generate(no_lines, no_columns, max_free, file_path=None):
+        # assert types
+        assert isinstance(no_lines, int), "Wrong parameter type"
+        assert isinstance(no_columns, int), "Wrong parameter type"
+        assert isinstance(max_free, int), "Wrong parameter type"
+
+        # imported here, the game logic imports the searches which import this module
+        from ..game_logic.layout import Layout
+        layout = Layout.get(no_lines, no_columns)
+
+        # assert values
+        assert 0 <= max_free <= min(layout.no_edges, 255), "Wrong parameter"
+
+        if file_path is None:
+            file_path = Tablebase.file_path(no_lines, no_columns)
+
+        records = []
+        # the values of the positions with one free edge less
+        # only one of the symmetric positions is kept (and written), they all have the same value
+        previous = {layout.full_mask: 0}
+
+        for free in range(max_free + 1):
+            if free:
+                current = {}
+                for edges_left in combinations(range(layout.no_edges), free):
+                    edges = layout.full_mask
+                    for edge in edges_left:
+                        edges ^= 1 << edge
+                    if layout.canonical_edges(edges)[0] == edges:
+                        current[edges] = Tablebase.retro_value(layout, edges, edges_left, previous)
+                previous = current
+
+            records.extend(previous.items())
+
+        records.sort()
+        Tablebase.write(layout, max_free, records, file_path)
+        return len(records)
+
+    # The value of a position from the values of the positions with one more edge drawn
+    # (previous holds the canonical positions only)
+    @staticmethod
+    def retro_value(layout, edges, edges_left, previous):
+        best = None
+        for edge in edges_left:
+            child = edges | 1 << edge
+            child_value = previous[layout.canonical_edges(child)[0]]
+
+            # the boxes the edge completes
+            boxes = 0
+            for box in layout.edge_boxes[edge]:
+                if not layout.box_masks[box] & ~child:
+                    boxes += 1
+
+            # a completed box keeps the turn, otherwise the opponent moves next
+            value = boxes + child_value if boxes else -child_value
+            if best is None or value > best:
+                best = value
+        return best
+
+    # Writes the sorted records to the file
+    @staticmethod
+    def write(layout, max_free, records, file_path):
+        key_bytes = (layout.no_edges + 7) // 8
+
+        directory = path.dirname(file_path)
+        if directory:
+            makedirs(directory, exist_ok=True)
+
+        # the old file can't be replaced while it is mapped
+        old = Tablebase.tablebases.pop(layout, None)
+        if old is not None:
+            old.data.close()
+
+        with open(file_path, "wb") as f:
+            f.write(Tablebase.magic + bytes([layout.no_lines, layout.no_columns, max_free, key_bytes]))
+            for edges, value in records:
+                f.write(edges.to_bytes(key_bytes, "big") + value.to_bytes(1, "big", signed=True))
+
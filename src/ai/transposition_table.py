@@ -0,0 +1,90 @@
+class Transposition_Table:
+    # Bound types of the stored values
+    EXACT = 0
+    LOWER = 1  # the value is at least the stored one (beta cutoff)
+    UPPER = 2  # the value is at most the stored one (no move raised alpha)
+
+    def __init__(self, size=1 << 18):
+        # assert types
+        assert isinstance(size, int), "Wrong parameter type"
+
+        # assert values
+        assert size >= 2, "Wrong parameter"
+
+        # every bucket has two entries:
+        # a depth-preferred one, replaced only by deeper (or equally deep) searches
+        # and an always-replace one, for whatever didn't fit into the first
+        self.no_buckets = size // 2
+        self.clear()
+
+    # Removes all the entries and statistics
+    def clear(self):
+        self.deep = [None] * self.no_buckets
+        self.recent = [None] * self.no_buckets
+        self.used = 0
+        self.reset_stats()
+
+    # Resets the statistics, keeping the entries
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.cutoffs = 0
+        self.collisions = 0
+        self.stores = 0
+
+    # The number of entries the table can hold
+    def size(self):
+        return 2 * self.no_buckets
+
+    # The fraction of the entries in use
+    def fill_rate(self):
+        return self.used / self.size()
+
+    # Statistics of the searches since the last reset
+    def stats(self):
+        return {
+            "probes": self.probes,
+            "hits": self.hits,
+            "cutoffs": self.cutoffs,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "fill_rate": self.fill_rate(),
+        }
+
+    # Returns the entry (key, depth, value, bound, move) of the position, or None
+    def probe(self, key):
+        self.probes += 1
+        bucket = key % self.no_buckets
+
+        for entry in (self.deep[bucket], self.recent[bucket]):
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry
+
+        # the bucket holds other positions
+        if self.deep[bucket] is not None:
+            self.collisions += 1
+        return None
+
+    # Stores the result of a search of the given depth
+    def store(self, key, depth, value, bound, move):
+        self.stores += 1
+        bucket = key % self.no_buckets
+        entry = (key, depth, value, bound, move)
+        deep = self.deep[bucket]
+
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            if deep is None:
+                self.used += 1
+            elif deep[0] != key:
+                # the replaced entry still gets a chance in the other slot
+                self.replace_recent(bucket, deep)
+            self.deep[bucket] = entry
+        else:
+            self.replace_recent(bucket, entry)
+
+    # Writes the always-replace entry of the bucket
+    def replace_recent(self, bucket, entry):
+        if self.recent[bucket] is None:
+            self.used += 1
+        self.recent[bucket] = entry
@@ -1 +1 @@
-from . import game, board
\ No newline at end of file
+from . import board
@@ -1,5 +1,7 @@
 from .box import Box
-from random import shuffle
+from .layout import Layout
+from .structure import Structure
+from random import Random
 
 
 class Board:
@@ -9,22 +11,191 @@ class Board:
     min_symbol = 'O'
     limit = 1000
 
+    # Move generation order
+    # The moves are shuffled with rng, so the ai doesn't start with the same move each time
+    # With ordered_moves, they come in the fixed order of the edges instead
+    rng = Random()
+    ordered_moves = False
+
     def __init__(self, boxes=None):
-        if boxes is None:
-            self.boxes = [[Box() for _ in range(Board.no_columns)] for _ in range(Board.no_lines)]
-        else:
-            self.boxes = boxes
+        # the precomputed tables of the current size, shared by all the boards of that size
+        self.layout = Layout.get(Board.no_lines, Board.no_columns)
+
+        # bitsets: one bit per edge, one bit per box completed by each player
+        self.edges = 0
+        self.max_boxes = 0
+        self.min_boxes = 0
+
+        # number of drawn sides of every box, kept up to date by make_edge and undo_edge
+        # plus the bitsets of the boxes with 2 sides (dangerous) and 3 sides (capturable)
+        self.sides = [0] * self.layout.no_boxes
+        self.two_sided = 0
+        self.three_sided = 0
 
         self.max_score = 0
         self.min_score = 0
         self.completed_box = False  # Keeps turn if True
-        self.current_player = Board.max_symbol
+
+        # Zobrist key of the position (edges, player to move, score difference)
+        # kept up to date by make_edge, undo_edge and by changing current_player
+        self.hash = self.layout.zobrist_score(0)
+        self.turn = Board.max_symbol
+
+        # the chains and loops of the board, brought up to date by analyze
+        self.structure = None
+
+        # the last grid of boxes built from the bitsets
+        self.boxes_key = None
+        self.boxes_grid = None
+
+        if boxes is not None:
+            self.boxes = boxes
 
     def __eq__(self, other):
         # assert types
         assert isinstance(other, Board), "Wrong parameter type"
 
-        return self.boxes == other.boxes
+        return self.layout is other.layout and \
+               self.edges == other.edges and \
+               self.max_boxes == other.max_boxes and \
+               self.min_boxes == other.min_boxes
+
+    # The player to move, flipping it also updates the hash
+    @property
+    def current_player(self):
+        return self.turn
+
+    @current_player.setter
+    def current_player(self, player):
+        if player != self.turn:
+            self.turn = player
+            self.hash ^= self.layout.zobrist_turn
+
+    # Copies the board, sharing the precomputed layout
+    def copy(self):
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board.sides = self.sides[:]
+        board.boxes_key = board.boxes_grid = None
+        return board
+
+    # deepcopy would also duplicate the layout tables
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # The grid of boxes, derived from the edge bitset
+    # Just like the original grid, it has a box for every point
+    # The last line and column only hold the bottom and right edges of the board
+    # The boxes are rebuilt when the board changes, so editing them doesn't affect the board
+    @property
+    def boxes(self):
+        key = (self.edges, self.max_boxes, self.min_boxes)
+        if self.boxes_key != key:
+            self.boxes_key = key
+            self.boxes_grid = self.build_boxes()
+        return self.boxes_grid
+
+    # Replaces the position with the one described by a grid of boxes
+    @boxes.setter
+    def boxes(self, boxes):
+        layout = self.layout
+        self.edges = self.max_boxes = self.min_boxes = 0
+
+        for edge, (i, j, direction) in enumerate(layout.moves):
+            # the point (i, j) is the top-left point of the box (i, j)
+            if direction == "right" and boxes[i][j].up or direction == "down" and boxes[i][j].left:
+                self.edges |= 1 << edge
+
+        for box in range(layout.no_boxes):
+            i, j = layout.box_position(box)
+            if boxes[i][j].symbol == Board.max_symbol:
+                self.max_boxes |= 1 << box
+            elif boxes[i][j].symbol == Board.min_symbol:
+                self.min_boxes |= 1 << box
+
+        self.max_score = bin(self.max_boxes).count('1')
+        self.min_score = bin(self.min_boxes).count('1')
+
+        self.count_sides()
+        self.compute_hash()
+
+    # Recomputes the Zobrist key from scratch
+    def compute_hash(self):
+        self.hash = self.layout.zobrist_score(self.max_score - self.min_score)
+
+        if self.turn == Board.min_symbol:
+            self.hash ^= self.layout.zobrist_turn
+
+        for edge, key in enumerate(self.layout.zobrist_edges):
+            if self.edges >> edge & 1:
+                self.hash ^= key
+
+    # Returns the smallest edge bitset among the symmetries of the position and the transform giving it
+    def canonical_edges(self):
+        return self.layout.canonical_edges(self.edges)
+
+    # Returns a key shared by all the symmetric positions (edges, player to move, score difference)
+    # and the transform from this position to the one the key describes
+    def canonical(self):
+        edges, transform = self.canonical_edges()
+        difference = self.max_score - self.min_score + self.layout.no_boxes
+
+        key = (edges * (2 * self.layout.no_boxes + 1) + difference) << 1 | (self.turn == Board.min_symbol)
+        return key, transform
+
+    # Moves a move with the given transform
+    # A move found for the canonical position goes back with transform_move(move, inverse_transform(transform))
+    def transform_move(self, move, transform):
+        layout = self.layout
+        if layout.transforms is None:
+            layout.build_symmetries()
+
+        edge = layout.edge_permutations[transform][layout.edge_index[move]]
+        return layout.moves[edge]
+
+    # The transform undoing the given one
+    def inverse_transform(self, transform):
+        if self.layout.transforms is None:
+            self.layout.build_symmetries()
+        return self.layout.inverses[transform]
+
+    # Recounts the sides of every box from the edge bitset
+    def count_sides(self):
+        self.two_sided = self.three_sided = 0
+
+        for box, mask in enumerate(self.layout.box_masks):
+            self.sides[box] = bin(self.edges & mask).count('1')
+
+            if self.sides[box] == 2:
+                self.two_sided |= 1 << box
+            elif self.sides[box] == 3:
+                self.three_sided |= 1 << box
+
+    # Builds the grid of boxes from the bitsets
+    def build_boxes(self):
+        layout = self.layout
+
+        def drawn(move):
+            edge = layout.edge_index.get(move)
+            return edge is not None and bool(self.edges >> edge & 1)
+
+        boxes = []
+        for i in range(layout.no_lines):
+            line = []
+            for j in range(layout.no_columns):
+                # the edges outside the board are never drawn
+                box = Box(drawn((i, j, "right")), drawn((i + 1, j, "right")),
+                          drawn((i, j, "down")), drawn((i, j + 1, "down")))
+
+                if i < layout.no_lines - 1 and j < layout.no_columns - 1:
+                    box_bit = 1 << (i * (layout.no_columns - 1) + j)
+                    if self.max_boxes & box_bit:
+                        box.symbol = Board.max_symbol
+                    elif self.min_boxes & box_bit:
+                        box.symbol = Board.min_symbol
+                line.append(box)
+            boxes.append(line)
+        return boxes
 
     # The actual board representation
     def __str__(self):
@@ -131,43 +302,58 @@ class Board:
 
         options = ''
 
-        # when going up from the point (i, j), add the left line of the box (i - 1, j)
-        if i > 0 and not self.boxes[i - 1][j].left:
-            options += "[u]p or "
-        # when going down from the point (i, j), add the left line of the box (i, j)
-        if i < Board.no_lines - 1 and not self.boxes[i][j].left:
-            options += "[d]own or "
-        # when going left from the point (i, j), add the up line of the box (i, j - 1)
-        if j > 0 and not self.boxes[i][j - 1].up:
-            options += "[l]eft or "
-        # when going right from the point (i, j), add the up line of the box (i, j)
-        if j < Board.no_columns - 1 and not self.boxes[i][j].up:
-            options += "[r]ight or "
+        # a direction is an option if its edge is on the board and isn't drawn yet
+        for direction in ["up", "down", "left", "right"]:
+            edge = self.layout.edge_index.get((i, j, direction))
+            if edge is not None and not self.edges >> edge & 1:
+                options += '[' + direction[0] + ']' + direction[1:] + " or "
 
         # remove the last " or "
         return options[:-4]
 
+    # Makes the shuffled move order reproducible
+    @staticmethod
+    def seed(seed):
+        Board.rng.seed(seed)
+
+    # Returns the number of edges that aren't drawn yet
+    def count_possible_moves(self):
+        return bin(self.layout.full_mask & ~self.edges).count('1')
+
+    # Yields the edges that aren't drawn yet, one at a time
+    # The board can be changed between two edges, as long as it is changed back
+    def generate_edges(self):
+        free = self.layout.full_mask & ~self.edges
+
+        if Board.ordered_moves:
+            while free:
+                low = free & -free
+                free ^= low
+                yield low.bit_length() - 1
+        else:
+            edges = []
+            while free:
+                low = free & -free
+                free ^= low
+                edges.append(low.bit_length() - 1)
+
+            # Fisher-Yates, shuffling only as far as the caller gets
+            for k in range(len(edges)):
+                r = Board.rng.randrange(k, len(edges))
+                edges[k], edges[r] = edges[r], edges[k]
+                yield edges[k]
+
+    # Yields the possible moves as tuples (i, j, direction), one at a time
+    # i, j -> coordinates of the point, not the box
+    # only "down" and "right" moves are generated to avoid duplicates
+    def generate_moves(self):
+        moves = self.layout.moves
+        for edge in self.generate_edges():
+            yield moves[edge]
+
     # Returns all the possible moves from the current state
     def get_possible_moves(self):
-        # moves will be a list of tuples (i, j, position)
-        # i, j -> coordinates of the point, not the box
-        moves = []
-
-        for i in range(Board.no_lines):
-            for j in range(Board.no_columns):
-                options = self.get_direction_options(i, j)
-                if options:
-                    directions = options.split(" or ")
-                    for direction in directions:
-                        # direction[1] + direction[3:] removes the []
-                        direction = direction[1] + direction[3:]
-                        # only keep down and right moves to avoid duplicates
-                        if direction == "down" or direction == "right":
-                            moves.append((i, j, direction))
-
-        # shuffle the moves so the ai can start with random moves instead of the same one each time
-        shuffle(moves)
-        return moves
+        return list(self.generate_moves())
 
     # Estimate for the easy AI
     def naive_score(self, current_player):
@@ -197,22 +383,20 @@ class Board:
         #                       the number of boxes the current player can complete
         # in other words, it's the maximum score reachable by the current player in a simulation
 
-        moves = []
+        edges = []
+        completed_box = self.completed_box
 
         if self.current_player == current_player:
-            almost_completed_boxes = self.almost_completed_boxes()
-            while almost_completed_boxes:
-                i, j, direction = almost_completed_boxes.pop()
+            almost_completed_edges = self.almost_completed_edges()
+            while almost_completed_edges:
+                edge = almost_completed_edges.pop()
                 # in case the current box got completed in the last move
-                if self.boxes[i][j].side_completed(direction):
+                if not self.make_edge(edge):
                     continue
-
-                new_i, new_j, direction = Board.translate_box_into_point(i, j, direction)
-                self.make_move(new_i, new_j, direction)
-                moves.append((new_i, new_j, direction))
+                edges.append(edge)
 
                 # add the new almost completed boxes
-                almost_completed_boxes += self.almost_completed_boxes()
+                almost_completed_edges += self.almost_completed_edges()
 
         # get the score before undoing the moves
         if current_player == Board.max_symbol:
@@ -221,13 +405,27 @@ class Board:
             answer = self.min_score
 
         # undo the moves
-        for move in moves:
-            i, j, direction = move
-            self.undo_move(i, j, direction)
+        for edge in edges:
+            self.undo_edge(edge)
+        self.completed_box = completed_box
 
         # return the answer
         return answer
 
+    # The score of a finished game: the winner's boxes, beyond the limit of any estimate
+    @staticmethod
+    def final_score(max_score, min_score):
+        # assert types
+        assert isinstance(max_score, int), "Wrong parameter type"
+        assert isinstance(min_score, int), "Wrong parameter type"
+
+        if max_score == min_score:
+            return 0
+        elif max_score > min_score:
+            return Board.limit + max_score
+        else:
+            return -Board.limit - min_score
+
     # Estimate for minimax
     def estimate_score(self, difficulty):
         # assert types
@@ -237,12 +435,7 @@ class Board:
         assert difficulty in ["Easy", "Medium", "Hard"], "Wrong parameter"
 
         if self.max_score + self.min_score == Board.get_total_score():
-            if self.max_score == self.min_score:
-                return 0
-            elif self.max_score > self.min_score:
-                return Board.limit + self.max_score
-            else:
-                return -Board.limit - self.min_score
+            return Board.final_score(self.max_score, self.min_score)
         else:
             # "Easy" because the enum difficulty str returns the string as title
             if difficulty == "Easy":
@@ -252,47 +445,117 @@ class Board:
                 # if the min player is the current player, returns 0 - min
                 return self.good_score(Board.max_symbol) - self.good_score(Board.min_symbol)
 
-    # Returns all almost completed boxes
+    # Returns all almost completed boxes, as (i, j, missing side of the box (i, j))
     def almost_completed_boxes(self):
         boxes = []
-        for i in range(Board.no_lines):
-            for j in range(Board.no_columns):
-                direction = self.boxes[i][j].almost_completed()
-                if direction:
-                    boxes.append((i, j, direction))
+        three_sided = self.three_sided
+        while three_sided:
+            box = (three_sided & -three_sided).bit_length() - 1
+            three_sided &= three_sided - 1
+
+            missing = self.layout.box_masks[box] & ~self.edges
+            side = self.layout.box_edges[box].index(missing.bit_length() - 1)
+            boxes.append(self.layout.box_position(box) + (["up", "down", "left", "right"][side],))
         return boxes
 
-    # Checks if the box (i, j) is completed and updates the score
-    def check_box_completed(self, i, j):
-        # assert types
-        assert isinstance(i, int), "Wrong parameter type"
-        assert isinstance(j, int), "Wrong parameter type"
-
-        if self.boxes[i][j].completed():
-            self.completed_box = True
-            self.boxes[i][j].symbol = self.current_player
+    # Returns the missing edge of every almost completed box
+    def almost_completed_edges(self):
+        edges = []
+        three_sided = self.three_sided
+        while three_sided:
+            box = (three_sided & -three_sided).bit_length() - 1
+            three_sided &= three_sided - 1
+
+            edges.append((self.layout.box_masks[box] & ~self.edges).bit_length() - 1)
+        return edges
+
+    # Returns the chains, loops and safe moves of the board
+    # The analysis is shared with the copies of the board and only redone around the edges changed since the last call
+    def analyze(self):
+        if self.structure is None:
+            self.structure = Structure(self.layout)
+        self.structure.update(self)
+        return self.structure
+
+    # Returns True if drawing the edge doesn't give a third side to any box
+    def is_safe_edge(self, edge):
+        for box in self.layout.edge_boxes[edge]:
+            if self.sides[box] >= 2:
+                return False
+        return True
 
-            if self.current_player == self.max_symbol:
-                self.max_score += 1
-            else:
-                self.min_score += 1
+    # Draws the edge, checking for completed boxes
+    # Returns False if the edge was already drawn
+    def make_edge(self, edge):
+        bit = 1 << edge
+        if self.edges & bit:
+            return False
 
-    # Undoes the completion of the box (i, j) and updates the score
-    def undo_box_completed(self, i, j):
-        # assert types
-        assert isinstance(i, int), "Wrong parameter type"
-        assert isinstance(j, int), "Wrong parameter type"
+        self.edges |= bit
+        self.hash ^= self.layout.zobrist_edges[edge]
+        self.completed_box = False
 
-        if self.boxes[i][j].completed():
-            self.completed_box = False
-            self.boxes[i][j].symbol = ' '
+        # an edge borders at most two boxes
+        for box in self.layout.edge_boxes[edge]:
+            sides = self.sides[box] + 1
+            self.sides[box] = sides
+            box_bit = 1 << box
+
+            if sides == 2:
+                self.two_sided |= box_bit
+            elif sides == 3:
+                self.two_sided ^= box_bit
+                self.three_sided |= box_bit
+            elif sides == 4:
+                self.three_sided ^= box_bit
+                self.completed_box = True
+                self.hash ^= self.layout.zobrist_score(self.max_score - self.min_score)
+
+                if self.turn == Board.max_symbol:
+                    self.max_boxes |= box_bit
+                    self.max_score += 1
+                else:
+                    self.min_boxes |= box_bit
+                    self.min_score += 1
+
+                self.hash ^= self.layout.zobrist_score(self.max_score - self.min_score)
+        return True
 
-            if self.current_player == self.max_symbol:
-                self.max_score -= 1
-            else:
-                self.min_score -= 1
+    # Erases the edge, giving back the boxes it completed
+    def undo_edge(self, edge):
+        bit = 1 << edge
+        if not self.edges & bit:
+            return
 
-    # Makes a move on the board, marking both boxes and checking for completed boxes
+        for box in self.layout.edge_boxes[edge]:
+            sides = self.sides[box]
+            self.sides[box] = sides - 1
+            box_bit = 1 << box
+
+            if sides == 2:
+                self.two_sided ^= box_bit
+            elif sides == 3:
+                self.three_sided ^= box_bit
+                self.two_sided |= box_bit
+            elif sides == 4:
+                self.three_sided |= box_bit
+                self.completed_box = False
+                self.hash ^= self.layout.zobrist_score(self.max_score - self.min_score)
+
+                # the box goes back to nobody, whoever completed it
+                if self.max_boxes & box_bit:
+                    self.max_boxes ^= box_bit
+                    self.max_score -= 1
+                else:
+                    self.min_boxes ^= box_bit
+                    self.min_score -= 1
+
+                self.hash ^= self.layout.zobrist_score(self.max_score - self.min_score)
+
+        self.edges ^= bit
+        self.hash ^= self.layout.zobrist_edges[edge]
+
+    # Makes a move on the board, marking the edge and checking for completed boxes
     # For the GUI -> If the move was already made, returns False to keep the player's turn
     def make_move(self, i, j, direction):
         # assert types
@@ -303,62 +566,13 @@ class Board:
         # assert values
         assert direction in ["up", "down", "left", "right"], "Wrong parameter"
 
-        if not self.valid_position(i, j):
-            return False
-
-        self.completed_box = False
-
-        if "right".startswith(direction):
-            # the up-left point (i, j) represents the box (i, j)
-            if self.boxes[i][j].up is True:
-                return False
-
-            self.boxes[i][j].up = True
-            self.check_box_completed(i, j)
-
-            # also complete the down line of the box (i - 1, j)
-            if self.valid_position(i - 1, j):
-                self.boxes[i - 1][j].down = True
-                self.check_box_completed(i - 1, j)
-        elif "down".startswith(direction):
-            # the up-left point (i, j) represents the box (i, j)
-            if self.boxes[i][j].left is True:
-                return False
-
-            self.boxes[i][j].left = True
-            self.check_box_completed(i, j)
-
-            # also complete the right line of the box (i, j - 1)
-            if self.valid_position(i, j - 1):
-                self.boxes[i][j - 1].right = True
-                self.check_box_completed(i, j - 1)
-        elif "left".startswith(direction):
-            # the up-right point (i, j) represents the box (i, j - 1)
-            if self.boxes[i][j - 1].up is True:
-                return False
+        edge = self.layout.edge_index.get((i, j, direction))
 
-            self.boxes[i][j - 1].up = True
-            self.check_box_completed(i, j - 1)
-
-            # also complete the down line of the box (i - 1, j - 1)
-            if self.valid_position(i - 1, j - 1):
-                self.boxes[i - 1][j - 1].down = True
-                self.check_box_completed(i - 1, j - 1)
-        elif "up".startswith(direction):
-            # the down-left point (i, j) represents the box (i - 1, j)
-            if self.boxes[i - 1][j].left is True:
-                return False
-
-            self.boxes[i - 1][j].left = True
-            self.check_box_completed(i - 1, j)
-
-            # also complete the right line of the box (i - 1, j - 1)
-            if self.valid_position(i - 1, j - 1):
-                self.boxes[i - 1][j - 1].right = True
-                self.check_box_completed(i - 1, j - 1)
+        # the edge is outside the board
+        if edge is None:
+            return False
 
-        # not a repeated move
-        return True
+        return self.make_edge(edge)
 
     # Undoes a move on the board, keeping the score accurate
     def undo_move(self, i, j, direction):
@@ -370,35 +584,7 @@ class Board:
         # assert values
         assert direction in ["up", "down", "left", "right"], "Wrong parameter"
 
-        if not self.valid_position(i, j):
-            return
+        edge = self.layout.edge_index.get((i, j, direction))
 
-        if "right".startswith(direction):
-            self.undo_box_completed(i, j)
-            self.boxes[i][j].up = False
-
-            if self.valid_position(i - 1, j):
-                self.undo_box_completed(i - 1, j)
-                self.boxes[i - 1][j].down = False
-        elif "down".startswith(direction):
-            self.undo_box_completed(i, j)
-            self.boxes[i][j].left = False
-
-            if self.valid_position(i, j - 1):
-                self.undo_box_completed(i, j - 1)
-                self.boxes[i][j - 1].right = False
-
-        elif "left".startswith(direction):
-            self.undo_box_completed(i, j - 1)
-            self.boxes[i][j - 1].up = False
-
-            if self.valid_position(i - 1, j - 1):
-                self.undo_box_completed(i - 1, j - 1)
-                self.boxes[i - 1][j - 1].down = False
-        elif "up".startswith(direction):
-            self.undo_box_completed(i - 1, j)
-            self.boxes[i - 1][j].left = False
-
-            if self.valid_position(i - 1, j - 1):
-                self.undo_box_completed(i - 1, j - 1)
-                self.boxes[i - 1][j - 1].right = False
+        if edge is not None:
+            self.undo_edge(edge)
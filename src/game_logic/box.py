@@ -70,7 +70,7 @@ class Box:
 
     # Returns which side is missing if the box is almost completed
     def almost_completed(self):
-        if repr(self).count('1') == 3:
+        if self.up + self.down + self.left + self.right == 3:
             if self.up is False:
                 return "up"
             if self.down is False:
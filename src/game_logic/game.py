@@ -1,11 +1,14 @@
+import atexit
 import sys
 import time
-from os import path
+from os import cpu_count, path
 from .board import Board
+from .match_log import Match_Log
 from ..gui.graphics import Graphics
-from ..ai.alpha_beta import Alpha_Beta
-from ..ai.ida_star import Ida_Star
-from ..misc import input_handler, heart, Algorithm, Difficulty
+from ..ai.calibrate import Calibration
+from ..ai.engine import Engine
+from ..ai.search_stats import Search_Stats
+from ..misc import input_handler, heart, Algorithm, Difficulty, Parallel
 
 
 class Game:
@@ -22,6 +25,7 @@ class Game:
         log_dir = path.join(path.dirname(__file__), '..', '..', 'logs')
 
     match_number = 1
+    match_log = None  # Match_Log of the current match
 
     # Settings
     algorithm = Algorithm.ALPHA_BETA  # Algorithm enum
@@ -30,15 +34,26 @@ class Game:
     pvp = False  # PvP or PvE
     gui = True  # GUI or CLI
 
-    depths = {
-    #   (n, 2)      (n, 3)      (n, 4)      (n, 5)     (n, 6)     (n, 7)
-        (2, 2):  0, (2, 3):  7, (2, 4): 10, (2, 5): 7, (2, 6): 6, (2, 7): 6,  # (2, m)
-        (3, 2):  7, (3, 3):  7, (3, 4):  6, (3, 5): 5, (3, 6): 5, (3, 7): 4,  # (3, m)
-        (4, 2): 10, (4, 3):  6, (4, 4):  5, (4, 5): 5, (4, 6): 4, (4, 7): 4,  # (4, m)
-        (5, 2):  7, (5, 3):  5, (5, 4):  5, (5, 5): 4, (5, 6): 4, (5, 7): 3,  # (5, m)
-        (6, 2):  6, (6, 3):  5, (6, 4):  4, (6, 5): 4, (6, 6): 3, (6, 7): 3,  # (6, m)
-        (7, 2):  6, (7, 3):  4, (7, 4):  4, (7, 5): 3, (7, 6): 3, (7, 7): 2,  # (7, m)
-    }
+    # Search budget per computer move (None -> no limit)
+    # With a time limit, the hard Alpha-Beta searches as deep as the time allows instead of using depths
+    # (with calibrated depths, as deep as the time allows up to the calibrated depth)
+    time_limit = Engine.time_limit  # seconds
+    node_limit = None
+
+    # Iterations of MCTS per move for the easy and medium ai, the hard one searches for time_limit seconds
+    mcts_iterations = Engine.mcts_iterations
+
+    # Processes of the Alpha-Beta and MCTS searches (1 -> the serial search) and how they share the work
+    workers = 1
+    parallel = Parallel.ROOT_SPLIT  # Parallel enum
+
+    # What the search of the last computer move did
+    stats = Search_Stats()
+
+    depths = Engine.depths
+
+    # The depths calibrated on this machine by algorithm (python -m src.ai.calibrate), else depths is used
+    calibrated_depths = Calibration.load(Calibration.file_path(log_dir))
 
     # Singleton class
     @classmethod
@@ -69,6 +84,12 @@ class Game:
         # assert types
         assert isinstance(print_heart, bool), "Wrong parameter type"
 
+        # a match left by quitting is aborted
+        Game.end_match()
+
+        # the processes of the parallel searches and their shared memory don't outlive the game
+        Engine.shutdown()
+
         input_handler.clear_screen()
         if print_heart:
             heart.Heart().print_full_heart()
@@ -103,11 +124,7 @@ class Game:
             Graphics().quit_graphics()
 
         # mark the match aborted in the logs
-        with open(path.join(Game.log_dir, 'time.txt'), 'a') as f:
-            f.write("Aborted\n")
-
-        with open(path.join(Game.log_dir, 'match_history.txt'), 'a') as f:
-            f.write("Aborted\n")
+        Game.end_match()
 
         Game.reset()
         Game.main_menu()
@@ -252,61 +269,26 @@ class Game:
         assert isinstance(computer_move_count, int), "Wrong parameter type"
 
         board = Game.game_board
-        time_start = time.time()
-        depth = Game.depths[(Board.no_lines, Board.no_columns)]
-
-        if Game.difficulty == "Medium":
-            depth = depth // 2
-        elif Game.difficulty == "Easy":
-            depth = 1
-
-        if Game.algorithm == Algorithm.IDA_STAR:
-            board.boxes = Ida_Star.get_move(board, depth)
-
-            # count computer's mew score
-            computer_score = 0
-            for i in range(Board.no_lines - 1):
-                for j in range(Board.no_columns - 1):
-                    if board.boxes[i][j].symbol == Ida_Star.computer_symbol:
-                        computer_score += 1
-
-            # if it is bigger than the previous score, then the computer has completed a box
-            if computer_score > board.get_player_score(Ida_Star.computer_symbol):
-                board.completed_box = True
-                if Ida_Star.computer_symbol == Board.max_symbol:
-                    board.max_score = computer_score
-                else:
-                    board.min_score = computer_score
-            else:
-                board.completed_box = False
+        player = board.current_player
+        time_start = time.perf_counter()
 
-        elif Game.algorithm == Algorithm.ALPHA_BETA:
-            move = Alpha_Beta.get_move(board, depth)
-
-            if move is None:
-                move = Alpha_Beta.get_move(board, 1)
+        calibrated = str(Game.algorithm) in Game.calibrated_depths
+        depths = Game.calibrated_depths.get(str(Game.algorithm), Game.depths)
+        engine = Engine(Game.algorithm, Game.difficulty, Game.time_limit, Game.node_limit,
+                        Game.workers, Game.parallel, Game.mcts_iterations, depths, calibrated=calibrated)
+        move = engine.get_move(board)
+        Game.stats = engine.stats
 
+        if move is not None:
             i, j, direction = move
 
             board.make_move(i, j, direction)
 
-        timer = time.time() - time_start
+        timer = time.perf_counter() - time_start
 
-        if abs(timer) > 0.01:
-            with open(path.join(Game.log_dir, 'time.txt'), 'a') as f:
-                if computer_move_count < 10:
-                    f.write(f"Move  {computer_move_count}: {timer} seconds\n")
-                else:
-                    f.write(f"Move {computer_move_count}: {timer} seconds\n")
-                computer_move_count += 2
-        else:
-            with open(path.join(Game.log_dir, 'time.txt'), 'a') as f:
-                if computer_move_count < 10:
-                    f.write(f"Move  {computer_move_count}: Instant\n")
-                else:
-                    f.write(f"Move {computer_move_count}: Instant\n")
-                computer_move_count += 2
-        return computer_move_count
+        if Game.match_log is not None:
+            Game.match_log.move(computer_move_count, player, move, timer, Game.stats)
+        return computer_move_count + 2
 
     # Writes the result of the match in the logs
     @staticmethod
@@ -315,21 +297,11 @@ class Game:
         assert isinstance(result, str), "Wrong parameter type"
         assert isinstance(time, float), "Wrong parameter type"
 
-        with open(path.join(Game.log_dir, 'match_history.txt'), 'a') as f:
-            if Game.pvp:
-                f.write(f"Players   : Player {Board.max_symbol} - Player {Board.min_symbol}\n")
-                f.write(f"Result    : {result}\n")
-            else:
-                if Game.player_symbol == Board.max_symbol:
-                    f.write(f"Players   : Player - Computer\n")
-                else:
-                    f.write(f"Players   : Computer - Player\n")
-                f.write(f"Result    : {result}\n")
-                f.write(f"Algorithm : {Game.algorithm}\n")
-                f.write(f"Difficulty: {Game.difficulty}\n")
-
-            f.write(f"Board size: {Board.no_lines}x{Board.no_columns}\n")
-            f.write(f"Duration  : {time:.2f} seconds\n")
+        if Game.match_log is not None:
+            board = Game.game_board
+            Game.match_log.result(result, time, board.max_score, board.min_score)
+            Game.match_log.flush()
+            Game.match_log = None
 
     # Prints the final score and the winner, also waits for input to continue
     # For the GUI, that input means quitting the window
@@ -421,6 +393,7 @@ class Game:
         options = "IDA*" + (" <-, " if Game.algorithm == Algorithm.IDA_STAR else ", ") + \
                   "Alpha-Beta" + (" <-, " if Game.algorithm == Algorithm.ALPHA_BETA else ", ") + \
                   "Bayesian Network" + (" <-, " if Game.algorithm == Algorithm.BAYESIAN_NETWORK else ", ") + \
+                  "MCTS" + (" <-, " if Game.algorithm == Algorithm.MCTS else ", ") + \
                   "Back"
 
         try:
@@ -444,8 +417,31 @@ class Game:
 
             if option != '0':
                 Game.difficulty = Difficulty.select_difficulty(option)
-                Alpha_Beta.difficulty = str(Game.difficulty)
-                Ida_Star.difficulty = str(Game.difficulty)
+        except KeyboardInterrupt:
+            Game.quit()
+
+    # Changes the number of processes of the Alpha-Beta search
+    @staticmethod
+    def change_workers():
+        counts = range(1, (cpu_count() or 1) + 1)
+        options = ", ".join(str(count) + (" <-" if count == Game.workers else "") for count in counts) + ", Back"
+
+        try:
+            option = input_handler.get_valid_input("< Choose the number of processes >", options)
+
+            if option != '0':
+                Game.workers = int(option)
+
+                # more processes can split the root moves or share a transposition table
+                if Game.workers > 1:
+                    options = "Root split" + (" <-, " if Game.parallel == Parallel.ROOT_SPLIT else ", ") + \
+                              "Lazy SMP" + (" <-, " if Game.parallel == Parallel.LAZY_SMP else ", ") + \
+                              "Back"
+
+                    option = input_handler.get_valid_input("< Choose how the processes search >", options)
+
+                    if option != '0':
+                        Game.parallel = Parallel.select_parallel(option)
         except KeyboardInterrupt:
             Game.quit()
 
@@ -485,7 +481,6 @@ class Game:
     # Changes the starting player
     @staticmethod
     def switch_starting_player():
-        Ida_Star.computer_symbol = Game.player_symbol
         Game.player_symbol = Board.min_symbol if Game.player_symbol == Board.max_symbol else Board.max_symbol
 
     # Toggles the GUI
@@ -507,16 +502,34 @@ class Game:
                "| |__| | (_) | |_\\__ \\ | (_>  < | |_) | (_) >  <  __/\\__ \\   \n" + \
                "|_____/ \\___/ \\__|___/  \\___/\\/ |____/ \\___/_/\\_\\___||___/\n"
 
-    # Writes the match number in the logs
+    # Starts the logs of a new match, with the current settings
     @staticmethod
-    def write_match_number(file_name):
-        # assert types
-        assert isinstance(file_name, str), "Wrong parameter type"
-
-        with open(path.join(Game.log_dir, f"{file_name}.txt"), 'w' if Game.match_number == 1 else 'a') as f:
-            if Game.match_number != 1:
-                f.write("\n")
-            f.write("Match " + str(Game.match_number) + '\n')
+    def start_match():
+        Game.end_match()
+        Game.match_log = Match_Log(Game.log_dir, Game.match_number, {
+            "pvp": Game.pvp,
+            "gui": Game.gui,
+            "player_symbol": Game.player_symbol,
+            "max_symbol": Board.max_symbol,
+            "min_symbol": Board.min_symbol,
+            "no_lines": Board.no_lines,
+            "no_columns": Board.no_columns,
+            "algorithm": str(Game.algorithm),
+            "difficulty": str(Game.difficulty),
+            "time_limit": Game.time_limit,
+            "node_limit": Game.node_limit,
+            "workers": Game.workers,
+            "parallel": str(Game.parallel),
+        })
+        Game.match_number += 1
+
+    # Writes the logs of a match that didn't get to its end, marked as aborted
+    @staticmethod
+    def end_match():
+        if Game.match_log is not None:
+            Game.match_log.abort()
+            Game.match_log.flush()
+            Game.match_log = None
 
     # Prints the logs to the screen
     @staticmethod
@@ -557,13 +570,7 @@ class Game:
                 Game.quit(True)
             else:
                 if option == '1':
-                    Game.write_match_number("time")
-                    with open(path.join(Game.log_dir, 'time.txt'), 'a') as f:
-                        f.write("Player - Player\n")
-
-                    Game.write_match_number("match_history")
-                    Game.match_number += 1
-
+                    Game.start_match()
                     Game.play()
                 elif option == '2':
                     Game.write_file("match_history")
@@ -590,6 +597,8 @@ class Game:
                   "Change difficulty (" + str(Game.difficulty) + "), " + \
                   "Change who starts first (" + ("Player" if Game.player_symbol == Board.max_symbol else "Computer") + "), " + \
                   "See computer time logs, " + \
+                  "Change the number of processes (" + str(Game.workers) + \
+                  (" - " + str(Game.parallel) if Game.workers > 1 else "") + "), " + \
                   "Quit"
 
         try:
@@ -599,10 +608,7 @@ class Game:
                 Game.quit(True)
             else:
                 if option == '1':
-                    Game.write_match_number("time")
-                    Game.write_match_number("match_history")
-                    Game.match_number += 1
-
+                    Game.start_match()
                     Game.play()
                 elif option == '2':
                     Game.write_file("match_history")
@@ -620,6 +626,8 @@ class Game:
                     Game.switch_starting_player()
                 elif option == '9':
                     Game.write_file("time")
+                elif option == '10':
+                    Game.change_workers()
 
                 Game.main_menu()
         except KeyboardInterrupt:
@@ -632,3 +640,9 @@ class Game:
             Game.main_menu_pvp()
         else:
             Game.main_menu_pve()
+
+
+# However the game ends (Ctrl-C or the end of the input in a menu, an error), the match in progress gets its logs
+# and the processes of the parallel searches are stopped
+atexit.register(Game.end_match)
+atexit.register(Engine.shutdown)
@@ -0,0 +1,187 @@
+from random import Random
+
+
+class Layout:
+    # One precomputed layout per board size
+    layouts = {}
+
+    def __init__(self, no_lines, no_columns):
+        # assert types
+        assert isinstance(no_lines, int), "Wrong parameter type"
+        assert isinstance(no_columns, int), "Wrong parameter type"
+
+        self.no_lines = no_lines
+        self.no_columns = no_columns
+
+        # edges are numbered horizontal first, then vertical
+        # horizontal edge (i, j, "right") -> i * (no_columns - 1) + j
+        # vertical edge (i, j, "down")    -> no_horizontal + i * no_columns + j
+        self.no_horizontal = no_lines * (no_columns - 1)
+        self.no_edges = self.no_horizontal + (no_lines - 1) * no_columns
+        self.full_mask = (1 << self.no_edges) - 1
+
+        # edge -> the (i, j, direction) move that draws it, using only "right" and "down"
+        self.moves = []
+        # every (i, j, direction) spelling of an edge -> edge
+        self.edge_index = {}
+
+        for i in range(no_lines):
+            for j in range(no_columns - 1):
+                edge = len(self.moves)
+                self.moves.append((i, j, "right"))
+                self.edge_index[(i, j, "right")] = edge
+                self.edge_index[(i, j + 1, "left")] = edge
+
+        for i in range(no_lines - 1):
+            for j in range(no_columns):
+                edge = len(self.moves)
+                self.moves.append((i, j, "down"))
+                self.edge_index[(i, j, "down")] = edge
+                self.edge_index[(i + 1, j, "up")] = edge
+
+        # box (i, j) -> box_index = i * (no_columns - 1) + j
+        # box_edges[box_index] = (up, down, left, right)
+        self.no_boxes = (no_lines - 1) * (no_columns - 1)
+        self.box_edges = []
+        self.box_masks = []
+        self.edge_boxes = [[] for _ in range(self.no_edges)]
+
+        for i in range(no_lines - 1):
+            for j in range(no_columns - 1):
+                box = len(self.box_edges)
+                sides = (self.horizontal(i, j), self.horizontal(i + 1, j),
+                         self.vertical(i, j), self.vertical(i, j + 1))
+
+                self.box_edges.append(sides)
+                self.box_masks.append(sum(1 << edge for edge in sides))
+                for edge in sides:
+                    self.edge_boxes[edge].append(box)
+
+        self.edge_boxes = [tuple(boxes) for boxes in self.edge_boxes]
+
+        # Zobrist keys: one per edge, one for O to move, one per score difference (max - min)
+        # seeded with the size, so every process (and every file) agrees on the keys
+        rng = Random(no_lines * 8 + no_columns)
+        self.zobrist_edges = [rng.getrandbits(64) for _ in range(self.no_edges)]
+        self.zobrist_turn = rng.getrandbits(64)
+        self.zobrist_scores = [rng.getrandbits(64) for _ in range(2 * self.no_boxes + 1)]
+
+        # symmetries, built the first time they are needed
+        self.transforms = None
+
+    # Only the size is pickled, the tables are rebuilt (or reused) on the other side
+    def __reduce__(self):
+        return Layout.get, (self.no_lines, self.no_columns)
+
+    # Returns the layout of the given size, building it only once
+    @classmethod
+    def get(cls, no_lines, no_columns):
+        key = (no_lines, no_columns)
+        if key not in cls.layouts:
+            cls.layouts[key] = cls(no_lines, no_columns)
+        return cls.layouts[key]
+
+    # The Zobrist key of the score difference max_score - min_score
+    def zobrist_score(self, difference):
+        return self.zobrist_scores[difference + self.no_boxes]
+
+    # Builds the tables of the symmetries of the board
+    # Every board has 4 (identity, two mirrors, half turn), square boards have 8 (also the quarter turns and diagonals)
+    def build_symmetries(self):
+        last_line, last_column = self.no_lines - 1, self.no_columns - 1
+
+        # each transform maps the point (i, j) to another point
+        transforms = [
+            lambda i, j: (i, j),
+            lambda i, j: (last_line - i, j),
+            lambda i, j: (i, last_column - j),
+            lambda i, j: (last_line - i, last_column - j),
+        ]
+        if self.no_lines == self.no_columns:
+            transforms += [
+                lambda i, j: (j, i),
+                lambda i, j: (last_column - j, last_line - i),
+                lambda i, j: (j, last_line - i),
+                lambda i, j: (last_column - j, i),
+            ]
+
+        # edge_permutations[t][edge] -> the edge it becomes
+        self.edge_permutations = []
+        for transform in transforms:
+            permutation = []
+            for i, j, direction in self.moves:
+                # the two ends of the edge, mapped
+                start = transform(i, j)
+                end = transform(i, j + 1) if direction == "right" else transform(i + 1, j)
+                first, second = min(start, end), max(start, end)
+
+                direction = "right" if first[0] == second[0] else "down"
+                permutation.append(self.edge_index[first + (direction,)])
+            self.edge_permutations.append(permutation)
+
+        # inverses[t] -> the transform undoing t
+        identity = list(range(self.no_edges))
+        self.inverses = []
+        for permutation in self.edge_permutations:
+            for inverse, other in enumerate(self.edge_permutations):
+                if [other[edge] for edge in permutation] == identity:
+                    self.inverses.append(inverse)
+                    break
+
+        # byte_tables[t][k][byte] -> the bits of the byte k of an edge bitset, moved by t
+        # so a whole bitset is moved with one lookup per byte instead of one per edge
+        self.byte_tables = []
+        for permutation in self.edge_permutations:
+            tables = []
+            for start in range(0, self.no_edges, 8):
+                table = [0] * 256
+                for byte in range(1, 256):
+                    low = byte & -byte
+                    edge = start + low.bit_length() - 1
+                    moved = 1 << permutation[edge] if edge < self.no_edges else 0
+                    table[byte] = table[byte ^ low] | moved
+                tables.append(table)
+            self.byte_tables.append(tables)
+
+        self.transforms = len(transforms)
+
+    # The number of symmetries of the board
+    def no_transforms(self):
+        if self.transforms is None:
+            self.build_symmetries()
+        return self.transforms
+
+    # Moves every edge of the bitset with the given transform
+    def transform_edges(self, edges, transform):
+        if self.transforms is None:
+            self.build_symmetries()
+
+        result = 0
+        for table in self.byte_tables[transform]:
+            if not edges:
+                break
+            result |= table[edges & 255]
+            edges >>= 8
+        return result
+
+    # Returns the smallest of the symmetric edge bitsets and the transform leading to it
+    def canonical_edges(self, edges):
+        best, best_transform = edges, 0
+
+        for transform in range(1, self.no_transforms()):
+            moved = self.transform_edges(edges, transform)
+            if moved < best:
+                best, best_transform = moved, transform
+        return best, best_transform
+
+    # The edge drawn from the point (i, j) to the point (i, j + 1)
+    def horizontal(self, i, j):
+        return i * (self.no_columns - 1) + j
+
+    # The edge drawn from the point (i, j) to the point (i + 1, j)
+    def vertical(self, i, j):
+        return self.no_horizontal + i * self.no_columns + j
+
+    # The (line, column) of the box with the given index
+    def box_position(self, box):
+        return divmod(box, self.no_columns - 1)
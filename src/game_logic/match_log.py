@@ -0,0 +1,132 @@
+import json
+import time
+import uuid
+from os import makedirs, path
+
+
+# The logs of one match, kept in memory and written once, when the match ends
+#
+# Every event is a record (a dict), the records go to matches.jsonl as JSON Lines:
+# - "match": the settings, when the match starts
+# - "move": a move of the computer, with its latency (perf_counter) and the statistics of its search
+# - "result" or "aborted": how the match ended
+# time.txt and match_history.txt are rendered from the same records, in their usual text format
+class Match_Log:
+    records_file = "matches.jsonl"
+    time_file = "time.txt"
+    history_file = "match_history.txt"
+
+    # Moves faster than this are shown as instant
+    instant = 0.01
+
+    # match_number counts the matches of the session, the text logs start again with the first one
+    def __init__(self, log_dir, match_number, settings):
+        # assert types
+        assert isinstance(match_number, int), "Wrong parameter type"
+        assert isinstance(settings, dict), "Wrong parameter type"
+
+        self.log_dir = log_dir
+        self.match_number = match_number
+        self.match_id = uuid.uuid4().hex
+        self.records = []
+        self.closed = False
+
+        self.add("match", time=time.time(), number=match_number, **settings)
+
+    # Buffers a record of the match
+    def add(self, kind, **fields):
+        self.records.append({"type": kind, "match": self.match_id, **fields})
+
+    # A move of the computer, count is the number of the move shown in the time log
+    def move(self, count, player, move, seconds, stats):
+        # assert types
+        assert isinstance(count, int), "Wrong parameter type"
+        assert isinstance(seconds, float), "Wrong parameter type"
+
+        self.add("move", count=count, player=player, edge=list(move) if move is not None else None,
+                 seconds=seconds, nodes=stats.nodes, summary=str(stats), stats=stats.to_dict())
+
+    # The end of the match, result as "1 - 0", "0 - 1" or "1/2 - 1/2"
+    def result(self, result, duration, max_score, min_score):
+        # assert types
+        assert isinstance(result, str), "Wrong parameter type"
+        assert isinstance(duration, float), "Wrong parameter type"
+
+        self.add("result", result=result, duration=duration, score=[max_score, min_score])
+
+    # The match was left before its end
+    def abort(self):
+        self.add("aborted")
+
+    # Writes the records and the text logs, once per file
+    def flush(self):
+        if self.closed:
+            return
+        self.closed = True
+
+        makedirs(self.log_dir, exist_ok=True)
+        with open(path.join(self.log_dir, Match_Log.records_file), 'a') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in self.records))
+
+        # the text logs hold the matches of the current session
+        mode = 'w' if self.match_number == 1 else 'a'
+        with open(path.join(self.log_dir, Match_Log.time_file), mode) as f:
+            f.write(Match_Log.render_time(self.records))
+        with open(path.join(self.log_dir, Match_Log.history_file), mode) as f:
+            f.write(Match_Log.render_history(self.records))
+
+    # Reads the records of a JSON Lines file
+    @staticmethod
+    def read(file_path):
+        with open(file_path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # The header of a match in the text logs
+    @staticmethod
+    def render_header(match):
+        return ("\n" if match["number"] != 1 else "") + f"Match {match['number']}\n"
+
+    # The records of a match in the format of time.txt
+    @staticmethod
+    def render_time(records):
+        text = ""
+        for record in records:
+            if record["type"] == "match":
+                text += Match_Log.render_header(record)
+                if record["pvp"]:
+                    text += "Player - Player\n"
+            elif record["type"] == "move":
+                count = f"{record['count']:>2}"
+                timer = f"{record['seconds']} seconds" if abs(record["seconds"]) > Match_Log.instant else "Instant"
+                text += f"Move {count}: {timer} | {record['summary']}\n"
+            elif record["type"] == "aborted":
+                text += "Aborted\n"
+        return text
+
+    # The records of a match in the format of match_history.txt
+    @staticmethod
+    def render_history(records):
+        text = ""
+        match = None
+        for record in records:
+            if record["type"] == "match":
+                match = record
+                text += Match_Log.render_header(record)
+            elif record["type"] == "result":
+                if match["pvp"]:
+                    text += f"Players   : Player {match['max_symbol']} - Player {match['min_symbol']}\n"
+                    text += f"Result    : {record['result']}\n"
+                else:
+                    if match["player_symbol"] == match["max_symbol"]:
+                        text += "Players   : Player - Computer\n"
+                    else:
+                        text += "Players   : Computer - Player\n"
+                    text += f"Result    : {record['result']}\n"
+                    text += f"Algorithm : {match['algorithm']}\n"
+                    text += f"Difficulty: {match['difficulty']}\n"
+
+                text += f"Board size: {match['no_lines']}x{match['no_columns']}\n"
+                text += f"Duration  : {record['duration']:.2f} seconds\n"
+            elif record["type"] == "aborted":
+                text += "Aborted\n"
+        return text
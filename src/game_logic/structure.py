@@ -0,0 +1,163 @@
+# A chain or a loop of the board, seen as strings and coins:
+# the boxes are coins, the free edges are strings, the free edges of the border lead to the ground
+class Component:
+    def __init__(self, kind, boxes, capturable, junctions):
+        self.kind = kind  # "chain" or "loop"
+        self.boxes = boxes  # the boxes, in order along the chain or loop
+        self.capturable = capturable  # how many of them have 3 sides
+        self.junctions = junctions  # how many free edges lead to boxes with 2 sides or less
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __repr__(self):
+        return f"{self.kind}({len(self.boxes)})"
+
+
+class Structure:
+    # Chains of at least this length are long: opening them gives the opponent a choice
+    long_chain = 3
+
+    def __init__(self, layout):
+        self.layout = layout
+
+        # the analysis describes this edge bitset, it starts with the empty board
+        self.edges = 0
+
+        # box -> the component it is part of (None for the boxes with less than 2 or 4 sides)
+        self.box_component = [None] * layout.no_boxes
+
+        # the chains and loops, and their counts by kind
+        self.components = set()
+        self.long_chains = 0
+        self.short_chains = 0
+        self.loops = {}  # loop size -> how many
+
+        # the free edges that don't give a third side to a box
+        self.safe = layout.full_mask
+
+    # Returns the number of safe moves left
+    def safe_moves(self):
+        return bin(self.safe).count('1')
+
+    # Returns the sizes of all the loops
+    def loop_sizes(self):
+        return sorted(size for size, count in self.loops.items() for _ in range(count))
+
+    # The chains and loops, sorted by kind and size
+    def decomposition(self):
+        return sorted(self.components, key=lambda component: (component.kind, len(component)))
+
+    # Brings the analysis up to date with the board
+    # Only the boxes next to the edges drawn or erased since the last update are looked at
+    def update(self, board):
+        changed = self.edges ^ board.edges
+        if not changed:
+            return
+        self.edges = board.edges
+
+        layout = self.layout
+        sides = board.sides
+
+        # the boxes whose number of sides changed
+        affected = set()
+        while changed:
+            low = changed & -changed
+            changed ^= low
+            affected.update(layout.edge_boxes[low.bit_length() - 1])
+
+        # their components and those next to them break apart, then get rebuilt
+        seeds = set()
+        for box in affected:
+            seeds.add(box)
+            seeds.update(self.neighbours(box))
+
+            # the safe edges only change around the affected boxes
+            for edge in layout.box_edges[box]:
+                bit = 1 << edge
+                if not self.edges & bit and all(sides[other] < 2 for other in layout.edge_boxes[edge]):
+                    self.safe |= bit
+                else:
+                    self.safe &= ~bit
+
+        for box in list(seeds):
+            component = self.box_component[box]
+            if component is not None:
+                self.remove(component)
+                seeds.update(component.boxes)
+
+        for box in seeds:
+            if self.box_component[box] is None and sides[box] in (2, 3):
+                self.add(self.build(box, sides))
+
+    # Returns the boxes next to the box through its free edges
+    def neighbours(self, box):
+        neighbours = []
+        for edge in self.layout.box_edges[box]:
+            if not self.edges >> edge & 1:
+                neighbours.extend(other for other in self.layout.edge_boxes[edge] if other != box)
+        return neighbours
+
+    # Collects the chain or loop the box is part of
+    def build(self, start, sides):
+        layout = self.layout
+
+        # walk both ways from the start box, through the boxes with 2 or 3 sides
+        # the start box has at most two neighbours, in a loop the second walk finds nothing new
+        visited = {start}
+        paths = [[], []]
+        for path, box in zip(paths, self.neighbours(start)):
+            while box is not None and box not in visited and sides[box] in (2, 3):
+                visited.add(box)
+                path.append(box)
+                box = next((other for other in self.neighbours(box) if other not in visited), None)
+
+        boxes = paths[0][::-1] + [start] + paths[1]
+
+        # a loop: every box has two free edges, each leading to another box of the loop
+        loop = True
+        junctions = 0
+        for box in boxes:
+            free = [edge for edge in layout.box_edges[box] if not self.edges >> edge & 1]
+            if len(free) != 2:
+                loop = False
+
+            for edge in free:
+                others = [other for other in layout.edge_boxes[edge] if other != box]
+                if not others:
+                    # the edge leads to the ground
+                    loop = False
+                elif others[0] not in visited:
+                    junctions += 1
+                    loop = False
+
+        capturable = sum(1 for box in boxes if sides[box] == 3)
+        return Component("loop" if loop else "chain", boxes, capturable, junctions)
+
+    # Adds a component to the analysis
+    def add(self, component):
+        self.components.add(component)
+        for box in component.boxes:
+            self.box_component[box] = component
+
+        if component.kind == "loop":
+            self.loops[len(component)] = self.loops.get(len(component), 0) + 1
+        elif len(component) >= Structure.long_chain:
+            self.long_chains += 1
+        else:
+            self.short_chains += 1
+
+    # Removes a component from the analysis
+    def remove(self, component):
+        self.components.discard(component)
+        for box in component.boxes:
+            self.box_component[box] = None
+
+        if component.kind == "loop":
+            self.loops[len(component)] -= 1
+            if not self.loops[len(component)]:
+                del self.loops[len(component)]
+        elif len(component) >= Structure.long_chain:
+            self.long_chains -= 1
+        else:
+            self.short_chains -= 1
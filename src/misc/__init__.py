@@ -1,2 +1,2 @@
-from .enums import Algorithm, Difficulty
-from . import input_handler, heart
+from .enums import Algorithm, Difficulty, Parallel
+from . import input_handler, heart, statistics
@@ -5,11 +5,14 @@ class Algorithm(Enum):
     IDA_STAR = 1
     ALPHA_BETA = 2
     BAYESIAN_NETWORK = 3
+    MCTS = 4
 
     def __str__(self):
         # IDA* looks better than Ida Star
         if self == Algorithm.IDA_STAR:
             return "IDA*"
+        if self == Algorithm.MCTS:
+            return "MCTS"
         return self.name.replace('_', ' ').title()
 
     # Returns the chosen algorithm
@@ -19,14 +22,16 @@ class Algorithm(Enum):
         assert isinstance(option, str), "Wrong parameter type"
 
         # assert values
-        assert option in "123", "Wrong parameter"
+        assert option in "1234", "Wrong parameter"
 
         if option == '1':
             return Algorithm.IDA_STAR
         elif option == '2':
             return Algorithm.ALPHA_BETA
-        else:
+        elif option == '3':
             return Algorithm.BAYESIAN_NETWORK
+        else:
+            return Algorithm.MCTS
 
 
 class Difficulty(Enum):
@@ -52,3 +57,28 @@ class Difficulty(Enum):
             return Difficulty.MEDIUM
         else:
             return Difficulty.HARD
+
+
+class Parallel(Enum):
+    ROOT_SPLIT = 1
+    LAZY_SMP = 2
+
+    def __str__(self):
+        # Lazy SMP looks better than Lazy Smp
+        if self == Parallel.LAZY_SMP:
+            return "Lazy SMP"
+        return self.name.replace('_', ' ').title()
+
+    # Returns the chosen parallel search
+    @staticmethod
+    def select_parallel(option):
+        # assert types
+        assert isinstance(option, str), "Wrong parameter type"
+
+        # assert values
+        assert option in "12", "Wrong parameter"
+
+        if option == '1':
+            return Parallel.ROOT_SPLIT
+        else:
+            return Parallel.LAZY_SMP
@@ -1,3 +1,4 @@
+import sys
 from os import system, name
 from time import sleep
 
@@ -56,7 +57,7 @@ def get_valid_input(title, text, board_menu=False, board_size=0):
             viable_options = [str(i) for i in range(2, 8)] + ['0']
     else:
         options = turn_into_options(text)
-        viable_options = [s[0] for s in options.split('[') if len(s) > 1 and s[0].isdigit()]
+        viable_options = [s.split(']')[0] for s in options.split('[') if len(s) > 1 and s[0].isdigit()]
 
     while True:
         clear_screen()
@@ -70,5 +71,6 @@ def get_valid_input(title, text, board_menu=False, board_size=0):
             print(f"Invalid input. Please type again")
             sleep(1.25)
         except (KeyboardInterrupt, EOFError):
+            # the game writes the logs of the match at exit
             clear_screen()
-            exit(0)
+            sys.exit(0)
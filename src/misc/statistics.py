@@ -0,0 +1,12 @@
+import math
+
+
+# The value below which the given fraction of the values fall (nearest rank), 0 for no values
+def percentile(values, fraction):
+    # assert values
+    assert 0 <= fraction <= 1, "Wrong parameter"
+
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
@@ -1,6 +1,30 @@
 from src.game_logic.board import Board
 from src.game_logic.game import Game
-from src.misc.enums import Algorithm
+from src.game_logic.layout import Layout
+from src.ai.alpha_beta import Alpha_Beta
+from src.ai.arena import Arena
+from src.ai.batch_playout import Batch_Playout
+from src.ai.benchmark import Benchmark
+from src.ai.calibrate import Calibration
+from src.ai.endgame import Endgame_Solver
+from src.ai.engine import Engine
+from src.ai.ida_star import Ida_Star
+from src.ai.lazy_smp import Lazy_Smp
+from src.ai.mcts import Mcts
+from src.ai.move_ordering import Move_Ordering
+from src.ai.opening_book import Opening_Book
+from src.ai.parallel_search import Parallel_Search
+from src.ai.perfect_solver import Perfect_Solver
+from src.ai.search_stats import Search_Stats
+from src.ai.shared_table import Shared_Table
+from src.ai.tablebase import Tablebase
+from src.ai.transposition_table import Transposition_Table
+from src.misc import statistics
+from src.misc.enums import Algorithm, Difficulty
+from os import path
+import subprocess
+import sys
+import tempfile
 import unittest
 
 
@@ -12,6 +36,17 @@ def make_move(board, x, y, direction):
 
 
 class TestDotsAndBoxesGame(unittest.TestCase):
+    # The searches read their settings from their classes, every test gives them back as they were
+    def setUp(self):
+        settings = (Alpha_Beta.difficulty, Alpha_Beta.use_tablebase, Alpha_Beta.tablebase,
+                    Ida_Star.difficulty, Ida_Star.computer_symbol, Game.algorithm, Game.difficulty)
+        self.addCleanup(self.restore_settings, settings)
+
+    @staticmethod
+    def restore_settings(settings):
+        (Alpha_Beta.difficulty, Alpha_Beta.use_tablebase, Alpha_Beta.tablebase,
+         Ida_Star.difficulty, Ida_Star.computer_symbol, Game.algorithm, Game.difficulty) = settings
+
     def test_alpha_beta_completing_box(self):
         Game.algorithm  = Algorithm.ALPHA_BETA
         Game.game_board = Board()
@@ -43,6 +78,558 @@ class TestDotsAndBoxesGame(unittest.TestCase):
         self.assertEqual(str(Game.algorithm), "IDA*")
         self.assertEqual(board.min_score, 1)
         self.assertEqual(board.current_player, board.min_symbol)
+        self.assertTrue(board.completed_box)
+
+    def test_ida_star_move(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+
+        # the move comes back, the board is left unchanged
+        self.assertEqual(Ida_Star.get_move(board, 3), (1, 0, "right"))
+        self.assertEqual(board.min_score, 0)
+
+        # without depth, any possible move
+        i, j, direction = Ida_Star.get_move(board, 0)
+        self.assertTrue(board.valid_position(i, j))
+
+    def test_transposition_table(self):
+        table = Transposition_Table(4)
+
+        table.store(1, 3, 10, Transposition_Table.EXACT, (0, 0, "right"))
+        # a shallower search of another position in the same bucket goes to the always-replace entry
+        table.store(3, 1, 5, Transposition_Table.LOWER, None)
+        # a deeper one takes the depth-preferred entry
+        table.store(5, 4, 7, Transposition_Table.UPPER, None)
+
+        self.assertEqual(table.probe(5), (5, 4, 7, Transposition_Table.UPPER, None))
+        self.assertEqual(table.probe(1)[2], 10)
+        self.assertIsNone(table.probe(3))
+        self.assertEqual(table.hits, 2)
+        self.assertEqual(table.collisions, 1)
+        self.assertEqual(table.fill_rate(), 0.5)
+
+    def test_alpha_beta_table(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+
+        Alpha_Beta.get_move(board, 3)
+        stats = Alpha_Beta.table.stats()
+
+        self.assertGreater(stats["stores"], 0)
+        self.assertGreater(stats["fill_rate"], 0)
+
+        # every iteration of the second search of the same position ends with the stored result
+        Alpha_Beta.get_move(board, 3)
+        self.assertEqual(Alpha_Beta.table.cutoffs, 3)
+
+    def test_alpha_beta_budget(self):
+        board = Board()
+
+        # the first iteration always finishes, so there is a move even with no budget left
+        move = Alpha_Beta.get_move(board, 20, 0.0, 1)
+
+        self.assertIn(move, board.get_possible_moves())
+        self.assertEqual(board.edges, 0)
+
+        # a search starting deeper keeps to the budget from its first iteration
+        self.assertIsNone(Alpha_Beta.get_move(board, 20, None, 1, 2))
+        self.assertEqual(Alpha_Beta.completed_depth, 0)
+
+        # the stored values are kept for the same settings only
+        self.assertNotEqual(Alpha_Beta.get_context(board.layout),
+                            (Alpha_Beta.difficulty, not Alpha_Beta.use_tablebase, board.layout))
+
+    def test_move_ordering(self):
+        board = Board()
+        ordering = Move_Ordering()
+
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+        make_move(board, 2, 2, "right")
+        make_move(board, 2, 2, "down")
+        ordering.cutoff(board, (3, 0, "right"), 1, 2)
+
+        moves = list(ordering.order(board, 1, (2, 0, "down")))
+
+        # the capture, the table move, the killer, then the rest
+        self.assertEqual(moves[:3], [(1, 0, "right"), (2, 0, "down"), (3, 0, "right")])
+        self.assertEqual(len(moves), board.count_possible_moves())
+
+        # the moves giving a third side to the box (2, 2) come last
+        self.assertEqual(sorted(moves[-2:]), [(2, 3, "down"), (3, 2, "right")])
+
+    def test_endgame_values(self):
+        self.assertEqual(Endgame_Solver.value((("chain", 3),)), -3)
+        # the second chain is opened by the one keeping control
+        self.assertEqual(Endgame_Solver.value((("chain", 3), ("chain", 3))), -2)
+        self.assertEqual(Endgame_Solver.value((("chain", 1), ("chain", 1))), 0)
+        self.assertEqual(Endgame_Solver.value((("chain", 3), ("loop", 4))), -1)
+
+    def test_endgame_solver(self):
+        board = Board()
+
+        # every line of boxes becomes a chain of 3
+        for i in range(Board.no_lines):
+            for j in range(Board.no_columns - 1):
+                make_move(board, i, j, "right")
+
+        self.assertTrue(Endgame_Solver.applies(board))
+
+        # only the hard ai solves the endgame, the medium one searches it
+        engine = Engine(Algorithm.ALPHA_BETA, Difficulty.HARD, use_tables=False)
+        engine.get_move(board)
+        self.assertEqual(engine.stats.engine, "Endgame solver")
+        engine = Engine(Algorithm.ALPHA_BETA, Difficulty.MEDIUM, use_tables=False)
+        engine.get_move(board)
+        self.assertEqual(engine.stats.engine, "Alpha-Beta")
+
+        # a chain gets opened at one end
+        i, j, direction = Endgame_Solver.get_move(board)
+        self.assertEqual(direction, "down")
+        self.assertIn(j, [0, Board.no_columns - 1])
+
+        make_move(board, i, j, direction)
+
+        # and the opponent takes the first box
+        self.assertEqual(Endgame_Solver.get_move(board), (i, 1 if j == 0 else 2, "down"))
+
+    def test_tablebase(self):
+        no_lines, no_columns = Board.no_lines, Board.no_columns
+        Board.no_lines = Board.no_columns = 3
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = path.join(directory, "3x3.tb")
+            Tablebase.generate(3, 3, 12, file_path)
+            tablebase = Tablebase(file_path)
+
+            try:
+                board = Board()
+                # the first player wins 3 - 1
+                self.assertEqual(tablebase.probe(board), 2)
+
+                make_move(board, 0, 0, "right")
+                make_move(board, 0, 0, "down")
+                make_move(board, 0, 1, "down")
+
+                # the symmetric position has the same value
+                mirror = Board()
+                make_move(mirror, 2, 0, "right")
+                make_move(mirror, 1, 0, "down")
+                make_move(mirror, 1, 1, "down")
+                self.assertEqual(tablebase.probe(board), tablebase.probe(mirror))
+
+                # the search finds the same value with fewer nodes
+                results = []
+                for current in [None, tablebase]:
+                    Alpha_Beta.table.clear()
+                    Alpha_Beta.ordering.age()
+                    Alpha_Beta.tablebase = current
+                    Alpha_Beta.root_depth = board.count_possible_moves()
+                    Alpha_Beta.nodes = 0
+                    value = Alpha_Beta.alpha_beta(board, Alpha_Beta.root_depth, -100, 100, False)[0]
+                    results.append((value, Alpha_Beta.nodes))
+
+                self.assertEqual(results[0][0], results[1][0])
+                self.assertLess(results[1][1], results[0][1])
+
+                # only the hard ai probes it
+                Tablebase.tablebases[board.layout] = tablebase
+                Alpha_Beta.difficulty = "Easy"
+                self.assertIsNone(Alpha_Beta.get_tablebase(board.layout))
+                Alpha_Beta.difficulty = "Hard"
+                self.assertIs(Alpha_Beta.get_tablebase(board.layout), tablebase)
+            finally:
+                Tablebase.tablebases.pop(board.layout, None)
+                tablebase.data.close()
+                Alpha_Beta.tablebase = None
+                Alpha_Beta.table.clear()
+                Board.no_lines, Board.no_columns = no_lines, no_columns
+
+    def test_perfect_solver(self):
+        no_lines, no_columns = Board.no_lines, Board.no_columns
+        Board.no_lines = Board.no_columns = 3
+
+        layout = Layout.get(3, 3)
+        values = Perfect_Solver.solve(layout)
+        Perfect_Solver.values[layout] = values
+
+        try:
+            # the same values as the tablebase
+            self.assertEqual(int(values[0]), 2)
+            self.assertEqual(int(values[layout.full_mask]), 0)
+
+            Game.algorithm  = Algorithm.ALPHA_BETA
+            Game.game_board = Board()
+            game            = Game().get_instance()
+            board           = game.game_board
+
+            make_move(board, 0, 0, "right")
+            make_move(board, 0, 0, "down")
+            make_move(board, 0, 1, "down")
+
+            value = Perfect_Solver.value(board, values)
+            game.computer_move(0)
+
+            # the box gets completed and the margin is kept
+            self.assertEqual(board.get_player_score(board.min_symbol), 1)
+            self.assertEqual(Perfect_Solver.value(board, values), value - 1)
+
+            # the bitsets of the bigger boards don't fit in 32 bits
+            with self.assertRaises(AssertionError):
+                Perfect_Solver.solve(Layout.get(5, 5))
+        finally:
+            del Perfect_Solver.values[layout]
+            Board.no_lines, Board.no_columns = no_lines, no_columns
+            Game.game_board = Board()
+
+    def test_opening_book(self):
+        board = Board()
+        book  = Opening_Book(board.layout)
+        book.build(board, 2, 1, 0.05)
+        self.assertEqual(len(book), 2)
+
+        move = book.get_move(board)
+        self.assertIsNotNone(move)
+
+        # the mirrored position gets the mirrored answer
+        mirror = Board()
+        make_move(board, *move)
+        make_move(mirror, *board.transform_move(move, 1))
+
+        i, j, direction = book.get_move(board)
+        self.assertEqual(book.get_move(mirror), board.transform_move((i, j, direction), 1))
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = path.join(directory, "book")
+            book.save(file_path)
+            self.assertEqual(Opening_Book.load(board.layout, file_path).moves, book.moves)
+
+    def test_ida_star_table(self):
+        board = Board()
+        for move in [(0, 0, "right"), (0, 2, "right"), (2, 0, "right"), (3, 2, "right"), (0, 2, "down"), (1, 1, "down")]:
+            make_move(board, *move)
+        edges, key = board.edges, board.hash
+
+        difficulty = Ida_Star.difficulty
+        Board.ordered_moves = True
+        Ida_Star.difficulty = "Hard"
+        try:
+            state = Ida_Star.ida_star(board, 5)
+        finally:
+            Board.ordered_moves = False
+            Ida_Star.difficulty = difficulty
+
+        # the search leaves the board as it was
+        self.assertEqual((board.edges, board.hash), (edges, key))
+
+        # the repeated iterations skip the subtrees already proven to go over the limit
+        self.assertGreater(Ida_Star.cutoffs, 0)
+        self.assertFalse(board.edges >> board.layout.edge_index[state.path[0]] & 1)
+
+    def test_parallel_search(self):
+        board = Board()
+        for move in [(0, 0, "right"), (0, 0, "down"), (1, 1, "right"), (2, 3, "down"), (3, 1, "right")]:
+            make_move(board, *move)
+
+        try:
+            move = Parallel_Search.get_move(board, 3, 2)
+        finally:
+            Parallel_Search.shutdown()
+
+        # the exact value of every root move, searched serially
+        values = {}
+        maximizing_player = board.current_player == board.max_symbol
+        for root_move in board.get_possible_moves():
+            child = board.copy()
+            make_move(child, *root_move)
+
+            Alpha_Beta.table.clear()
+            Alpha_Beta.root_depth = 3
+            values[root_move] = Alpha_Beta.alpha_beta(child, 2, -10000, 10000,
+                                                      child.current_player == board.max_symbol)[0]
+
+        best = max(values.values()) if maximizing_player else min(values.values())
+        self.assertEqual(values[move], best)
+
+        # the workers follow the tablebase setting they are given, not the one they started with
+        Alpha_Beta.tablebase = object()
+        Parallel_Search.search_move(board.copy(), move, 1, maximizing_player, "Hard", False, None, None)
+        self.assertIsNone(Alpha_Beta.tablebase)
+        self.assertEqual(Alpha_Beta.table_context, ("Hard", False, board.layout))
+
+    def test_shared_table(self):
+        table = Shared_Table(4)
+        other = Shared_Table(name=table.name)
+
+        try:
+            table.store(6, 3, -1005, Shared_Table.LOWER, (2, 1, "down"))
+            table.store(8, 1, 7, Shared_Table.EXACT, None)
+
+            # the other process sees the entries
+            self.assertEqual(other.probe(6), (6, 3, -1005, Shared_Table.LOWER, (2, 1, "down")))
+            self.assertEqual(other.probe(8), (8, 1, 7, Shared_Table.EXACT, None))
+            self.assertIsNone(other.probe(10))
+
+            # a half-written entry fails the key check
+            other.words[1] ^= 1 << 16
+            self.assertIsNone(table.probe(6))
+
+            other.clear()
+            self.assertEqual(table.fill_rate(), 0)
+        finally:
+            other.close()
+            table.close()
+            table.unlink()
+
+    def test_lazy_smp(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+
+        try:
+            move = Lazy_Smp.get_move(board, 2, 2)
+            fill_rate = Lazy_Smp.table.fill_rate()
+            table_name = Lazy_Smp.table.name
+        finally:
+            Engine.shutdown()
+
+        # the box gets completed, both workers searched to the end and filled the table
+        self.assertEqual(move, (1, 0, "right"))
+        self.assertEqual(Lazy_Smp.completed_depth, 2)
+        self.assertGreater(fill_rate, 0)
+
+        # the shared memory is freed with the processes
+        self.assertIsNone(Lazy_Smp.executor)
+        with self.assertRaises(FileNotFoundError):
+            Shared_Table(name=table_name)
+
+        # the workers follow the tablebase setting they are given
+        Alpha_Beta.use_tablebase = True
+        Lazy_Smp.search(board.copy(), 1, 0, 0, "Hard", False, None, None)
+        self.assertIsNone(Alpha_Beta.tablebase)
+
+    def test_mcts_budget(self):
+        board = Board()
+
+        # the first iteration always runs, so there is a move even with no budget left
+        Mcts.root = None
+        move = Mcts.get_move(board, 0.0)
+
+        self.assertIn(move, board.get_possible_moves())
+        self.assertGreaterEqual(Mcts.iterations, 1)
+        self.assertEqual(board.edges, 0)
+
+    def test_mcts_workers(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+
+        # a task of the pool searches a new tree, even when its process searched the position before
+        Mcts.root = None
+        for seed in range(3):
+            visits, stats = Mcts.search(board, None, 50, seed, False)
+            self.assertEqual(sum(visits.values()), 50)
+            self.assertEqual(stats.leaves, 50)
+
+        # so the visits of the workers add up to their iterations
+        try:
+            Mcts.get_move(board, iterations=50, workers=2)
+        finally:
+            Mcts.shutdown()
+        self.assertEqual(Mcts.iterations, 2 * 50)
+
+    def test_mcts(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+        edges, key = board.edges, board.hash
+
+        Mcts.root = None
+        Mcts.rng.seed(0)
+        Board.seed(0)
+        move = Mcts.get_move(board, iterations=2000)
+
+        # the box gets completed, the board is left unchanged
+        self.assertEqual(move, (1, 0, "right"))
+        self.assertEqual((board.edges, board.hash), (edges, key))
+        self.assertEqual(Mcts.iterations, 2000)
+        self.assertEqual(Mcts.root.visits, 2000)
+
+        # the next search continues with the subtree of the new position
+        make_move(board, *move)
+        child = next(child for child in Mcts.root.children if child.key == board.hash)
+        visits = child.visits
+
+        Mcts.get_move(board, iterations=100)
+        self.assertIs(Mcts.root, child)
+        self.assertEqual(Mcts.root.visits, visits + 100)
+        self.assertIsNone(Mcts.root.parent)
+
+    def test_batch_playout(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+
+        batch  = Batch_Playout(board, 16, 0)
+        boards = [board.copy() for _ in range(16)]
+
+        # the same edges give the same boxes, scores and turns as the board
+        while True:
+            chosen = batch.choose(Batch_Playout.GREEDY)
+            if (chosen < 0).all():
+                break
+            batch.play(chosen)
+
+            for copy, edge in zip(boards, chosen):
+                if edge >= 0:
+                    copy.make_edge(int(edge))
+                    if not copy.completed_box:
+                        copy.current_player = copy.get_opponent()
+
+        for index, copy in enumerate(boards):
+            self.assertEqual((copy.max_score, copy.min_score), tuple(batch.scores[index]))
+            self.assertEqual(list(copy.sides), list(batch.sides[index, :-1]))
+
+        # the greedy playouts always take the box offered to min
+        margins = Batch_Playout.playout(board, 100, Batch_Playout.GREEDY, 1)
+        self.assertEqual(len(margins), 100)
+        self.assertTrue(all(abs(margin) <= board.get_total_score() for margin in margins))
+        self.assertTrue(batch.finished().all())
+
+    def test_arena(self):
+        no_lines, no_columns = Board.no_lines, Board.no_columns
+        engines = [Engine(Algorithm.ALPHA_BETA, Difficulty.EASY, use_tables=False),
+                   Engine(Algorithm.IDA_STAR, Difficulty.EASY, use_tables=False)]
+
+        try:
+            margins, latencies = Arena.play_match(3, 3, engines, 4, seed=1)
+
+            # every game draws the 12 edges of the board, the same seed plays the same games
+            self.assertEqual(len(margins), 4)
+            self.assertTrue(all(abs(margin) <= 4 for margin in margins))
+            self.assertEqual(len(latencies[0]) + len(latencies[1]), 4 * 12)
+            self.assertEqual(Arena.play_match(3, 3, engines, 4, seed=1)[0], margins)
+            self.assertIn("Alpha Beta (Easy)", Arena.report(engines, margins, latencies))
+        finally:
+            Board.no_lines, Board.no_columns = no_lines, no_columns
+
+        # the arena runs without pygame
+        imported = subprocess.run([sys.executable, "-c", "import sys, src.ai.arena; print('pygame' in sys.modules)"],
+                                  capture_output=True, text=True, cwd=path.join(path.dirname(__file__), '..'))
+        self.assertEqual(imported.stdout.strip(), "False")
+
+    def test_benchmark(self):
+        no_lines, no_columns = Board.no_lines, Board.no_columns
+
+        try:
+            # every position of the corpus is a game in progress of its size
+            for size in Benchmark.sizes:
+                Board.no_lines, Board.no_columns = size
+                positions = Benchmark.load_corpus(*size)
+                self.assertTrue(positions)
+                self.assertTrue(all(not Benchmark.play(moves).is_finished() for moves in positions))
+        finally:
+            Board.no_lines, Board.no_columns = no_lines, no_columns
+
+        # the same searches give the same nodes and moves
+        first  = Benchmark.run([(3, 3)], Benchmark.algorithms, 3)
+        second = Benchmark.run([(3, 3)], Benchmark.algorithms, 3)
+        self.assertEqual([(result["move"], result["nodes"]) for result in first["results"]],
+                         [(result["move"], result["nodes"]) for result in second["results"]])
+        self.assertEqual(len(first["results"]), 2 * len(Benchmark.load_corpus(3, 3)))
+        self.assertEqual(first["totals"]["alpha_beta"]["nodes"],
+                         sum(result["nodes"] for result in first["results"] if result["algorithm"] == "alpha_beta"))
+        self.assertEqual((Board.no_lines, Board.no_columns), (no_lines, no_columns))
+
+    def test_search_stats(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+
+        Alpha_Beta.difficulty = "Hard"
+        Alpha_Beta.get_move(board, 3)
+        stats = Alpha_Beta.stats
+
+        # one entry per iteration, the leaves are at the depth of the last one
+        self.assertEqual(stats.nodes, Alpha_Beta.nodes)
+        self.assertEqual([depth for depth, _, _ in stats.iterations], [1, 2, 3])
+        self.assertEqual(stats.iterations[-1][1], stats.nodes)
+        self.assertEqual(stats.max_depth, 3)
+        self.assertTrue(0 < stats.leaves < stats.nodes)
+        self.assertGreater(sum(stats.cutoffs), 0)
+        self.assertGreater(stats.probes, 0)
+        self.assertTrue(0 <= stats.hit_rate() <= 1)
+
+        # the transposition table counters are copied, and shown in the time log
+        self.assertEqual(stats.table_cutoffs, Alpha_Beta.table.cutoffs)
+        self.assertEqual(stats.collisions, Alpha_Beta.table.collisions)
+        self.assertEqual(stats.fill_rate, Alpha_Beta.table.fill_rate())
+        self.assertTrue(0 < stats.fill_rate <= 1)
+        self.assertIn("table cutoffs", str(stats))
+        self.assertIn("collisions", str(stats))
+        self.assertIn("table filled", str(stats))
+
+        # the statistics of the processes add up
+        total = Search_Stats()
+        total.add(stats)
+        total.add(stats)
+        self.assertEqual(total.nodes, 2 * stats.nodes)
+        self.assertEqual(total.cutoffs, [2 * count for count in stats.cutoffs])
+        self.assertEqual(total.table_cutoffs, 2 * stats.table_cutoffs)
+        self.assertEqual(total.fill_rate, stats.fill_rate)
+
+        # every engine fills them, the table moves too
+        engine = Engine(Algorithm.IDA_STAR, Difficulty.MEDIUM, use_tables=False)
+        engine.get_move(board)
+        self.assertEqual(engine.stats.engine, "IDA*")
+        self.assertEqual(engine.stats.nodes, Ida_Star.nodes)
+        self.assertGreater(engine.stats.seconds, 0)
+
+        engine = Engine(Algorithm.MCTS, Difficulty.EASY)
+        engine.get_move(board)
+        self.assertEqual(engine.stats.leaves, Mcts.iterations)
+        self.assertIn("MCTS", str(engine.stats))
+
+    def test_calibration(self):
+        # no time at all still gives depth 1, enough time gives the deepest depth tried
+        self.assertEqual(Calibration.calibrate([(3, 3)], ["alpha_beta"], 0.0, max_depth=3),
+                         {"Alpha Beta": {(3, 3): 1}})
+        table = Calibration.calibrate([(3, 3)], ["alpha_beta", "ida_star"], 60.0, max_depth=3)
+        self.assertEqual(table, {"Alpha Beta": {(3, 3): 3}, "IDA*": {(3, 3): 3}})
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Calibration.file_path(directory)
+
+            # without the file, the game keeps the built-in depths
+            self.assertEqual(Calibration.load(file_path), {})
+
+            Calibration.save(table, 60.0, 0.95, file_path)
+            loaded = Calibration.load(file_path)
+            self.assertEqual(loaded["Alpha Beta"][(3, 3)], 3)
+            self.assertEqual(loaded["IDA*"][(4, 4)], Engine.depths[(4, 4)])
+
+            with open(file_path, 'w') as f:
+                f.write("{")
+            self.assertEqual(Calibration.load(file_path), {})
+
+        # with a time limit, the hard Alpha-Beta stops at the calibrated depth, else at the end of the game
+        board = Board()
+        depths = loaded["Alpha Beta"]
+        calibrated = Engine(Algorithm.ALPHA_BETA, Difficulty.HARD, 2.0, depths=depths, calibrated=True)
+        built_in = Engine(Algorithm.ALPHA_BETA, Difficulty.HARD, 2.0)
+        self.assertEqual(calibrated.get_depth(board), depths[(Board.no_lines, Board.no_columns)])
+        self.assertEqual(built_in.get_depth(board), board.count_possible_moves())
+
+        # the latency at a percentile, by nearest rank
+        self.assertEqual(statistics.percentile([0.3, 0.1, 0.2, 0.4], 0.5), 0.2)
+        self.assertEqual(statistics.percentile([], 0.95), 0.0)
 
 
 if __name__ == '__main__':
@@ -96,6 +96,148 @@ class TestDotsAndBoxesGame(unittest.TestCase):
 
         self.assertTrue(board.is_finished())
 
+    def test_boxes_grid(self):
+        board = Board()
+
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+        make_move(board, 0, 1, "down")
+        make_move(board, 1, 0, "right")
+
+        # the grid is derived from the edges
+        self.assertTrue(board.boxes[0][0].completed())
+        self.assertEqual(board.boxes[0][0].symbol, board.min_symbol)
+        self.assertTrue(board.boxes[1][0].up)
+        self.assertTrue(board.boxes[0][1].left)
+
+        # and a grid can be turned back into edges
+        copy = Board()
+        copy.boxes = board.boxes
+
+        self.assertEqual(copy, board)
+        self.assertEqual(copy.min_score, 1)
+        self.assertEqual(sorted(copy.get_possible_moves()), sorted(board.get_possible_moves()))
+
+    def test_edge_outside_board(self):
+        board = Board()
+
+        self.assertFalse(make_move(board, Board.no_lines - 1, 0, "down"))
+        self.assertFalse(make_move(board, 0, Board.no_columns - 1, "right"))
+        self.assertFalse(make_move(board, 0, 0, "up"))
+        self.assertEqual(board.edges, 0)
+
+    def test_side_counters(self):
+        board = Board()
+
+        make_move(board, 0, 0, "right")
+        make_move(board, 0, 0, "down")
+
+        self.assertEqual(board.sides[0], 2)
+        self.assertEqual(board.two_sided, 1)
+
+        make_move(board, 0, 1, "down")
+
+        self.assertEqual(board.two_sided, 0)
+        self.assertEqual(board.three_sided, 1)
+        self.assertEqual(board.almost_completed_boxes(), [(0, 0, "down")])
+
+        board.undo_move(0, 1, "down")
+
+        self.assertEqual(board.sides[0], 2)
+        self.assertEqual(board.three_sided, 0)
+        self.assertEqual(board.almost_completed_boxes(), [])
+
+    def test_move_generation(self):
+        board = Board()
+        make_move(board, 0, 0, "right")
+
+        moves = board.get_possible_moves()
+        self.assertEqual(len(moves), board.count_possible_moves())
+        self.assertNotIn((0, 0, "right"), moves)
+
+        # the same seed gives the same order
+        Board.seed(7)
+        first = board.get_possible_moves()
+        Board.seed(7)
+        self.assertEqual(board.get_possible_moves(), first)
+
+        # the ordered mode follows the edges
+        Board.ordered_moves = True
+        self.assertEqual(next(board.generate_moves()), (0, 1, "right"))
+        Board.ordered_moves = False
+
+    def test_hash(self):
+        first = Board()
+        second = Board()
+        empty_hash = first.hash
+
+        # the same position reached in a different order has the same hash
+        make_move(first, 0, 0, "right")
+        make_move(first, 1, 1, "down")
+        make_move(second, 1, 1, "down")
+        make_move(second, 0, 0, "right")
+
+        self.assertEqual(first.hash, second.hash)
+
+        # but not with another player to move
+        second.current_player = second.get_opponent()
+        self.assertNotEqual(first.hash, second.hash)
+
+        first.undo_move(1, 1, "down")
+        first.undo_move(0, 0, "right")
+        self.assertEqual(first.hash, empty_hash)
+
+    def test_canonical(self):
+        first = Board()
+        second = Board()
+
+        # the top-left and the bottom-right corners are symmetric
+        make_move(first, 0, 0, "right")
+        make_move(second, Board.no_lines - 1, Board.no_columns - 2, "right")
+
+        first_key, first_transform = first.canonical()
+        second_key, second_transform = second.canonical()
+        self.assertEqual(first_key, second_key)
+        self.assertEqual(first.layout.no_transforms(), 8)
+
+        # a move of the canonical position goes back to the same move
+        move = first.transform_move((1, 1, "down"), first_transform)
+        self.assertEqual(first.transform_move(move, first.inverse_transform(first_transform)), (1, 1, "down"))
+
+        # both boards agree on the canonical move
+        corner = second.transform_move((Board.no_lines - 1, Board.no_columns - 2, "right"), second_transform)
+        self.assertEqual(corner, first.transform_move((0, 0, "right"), first_transform))
+
+    def test_chains_and_loops(self):
+        board = Board()
+
+        # the top line of boxes, closed above and below -> a chain of 3
+        for j in range(3):
+            make_move(board, 0, j, "right")
+            make_move(board, 1, j, "right")
+
+        structure = board.analyze()
+        self.assertEqual(structure.long_chains, 1)
+        self.assertEqual(sorted(structure.decomposition()[0].boxes), [0, 1, 2])
+        self.assertEqual(structure.safe_moves(), 14)
+
+        # the 2x2 square below it, closed on the outside -> a loop of 4
+        board = Board()
+        for move in [(0, 0, "right"), (0, 1, "right"), (2, 0, "right"), (2, 1, "right"),
+                     (0, 0, "down"), (1, 0, "down"), (0, 2, "down"), (1, 2, "down")]:
+            make_move(board, *move)
+
+        structure = board.analyze()
+        self.assertEqual(structure.loop_sizes(), [4])
+        self.assertEqual(structure.long_chains, 0)
+
+        # opening the loop turns it into a chain with two capturable ends
+        make_move(board, 0, 1, "down")
+
+        structure = board.analyze()
+        self.assertEqual(structure.loop_sizes(), [])
+        self.assertEqual(structure.decomposition()[0].capturable, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,11 @@
 from src.game_logic.board import Board
 from src.game_logic.game import Game
+from src.game_logic.match_log import Match_Log
 from copy import deepcopy
+from os import path
+import subprocess
+import sys
+import tempfile
 import unittest
 
 
@@ -23,6 +28,68 @@ class TestDotsAndBoxesGame(unittest.TestCase):
         self.assertEqual(game.pvp, False)
         self.assertEqual(game.gui, True)
 
+    def test_match_log(self):
+        log_dir, match_number, time_limit = Game.log_dir, Game.match_number, Game.time_limit
+
+        with tempfile.TemporaryDirectory() as directory:
+            Game.log_dir, Game.match_number, Game.time_limit = directory, 1, 0.1
+            try:
+                Game.reset()
+                Game.start_match()
+
+                board = Game.game_board
+                board.make_move(0, 0, "right")
+                board.current_player = board.get_opponent()
+                Game.computer_move(2)
+
+                # nothing is written before the end of the match
+                self.assertFalse(path.exists(path.join(directory, Match_Log.records_file)))
+
+                Game.write_result("0 - 1", 1.5)
+                records = Match_Log.read(path.join(directory, Match_Log.records_file))
+
+                self.assertEqual([record["type"] for record in records], ["match", "move", "result"])
+                self.assertEqual(len({record["match"] for record in records}), 1)
+                self.assertEqual(records[1]["count"], 2)
+                self.assertEqual(records[1]["nodes"], Game.stats.nodes)
+
+                # the text logs keep their format
+                with open(path.join(directory, Match_Log.time_file)) as f:
+                    self.assertTrue(f.read().startswith("Match 1\nMove  2: "))
+                with open(path.join(directory, Match_Log.history_file)) as f:
+                    self.assertEqual(f.read(), "Match 1\n"
+                                               "Players   : Player - Computer\n"
+                                               "Result    : 0 - 1\n"
+                                               "Algorithm : Alpha Beta\n"
+                                               "Difficulty: Hard\n"
+                                               f"Board size: {Board.no_lines}x{Board.no_columns}\n"
+                                               "Duration  : 1.50 seconds\n")
+
+                # the next match is added, a match left early is marked as aborted
+                Game.start_match()
+                Game.end_match()
+                with open(path.join(directory, Match_Log.history_file)) as f:
+                    self.assertTrue(f.read().endswith("Duration  : 1.50 seconds\n\nMatch 2\nAborted\n"))
+                self.assertEqual(Match_Log.read(path.join(directory, Match_Log.records_file))[-1]["type"], "aborted")
+            finally:
+                Game.log_dir, Game.match_number, Game.time_limit = log_dir, match_number, time_limit
+                Game.match_log = None
+                Game.reset()
+
+        # a game ended by Ctrl-C or the end of the input in a menu still writes the match
+        with tempfile.TemporaryDirectory() as directory:
+            script = ("from src.game_logic.game import Game\n"
+                      "from src.misc import input_handler\n"
+                      f"Game.log_dir = {directory!r}\n"
+                      "Game.start_match()\n"
+                      "input_handler.get_valid_input('', 'Start, Quit')\n")
+            process = subprocess.run([sys.executable, "-c", script], stdin=subprocess.DEVNULL, capture_output=True,
+                                     timeout=60, cwd=path.join(path.dirname(__file__), '..'))
+
+            self.assertEqual(process.returncode, 0)
+            records = Match_Log.read(path.join(directory, Match_Log.records_file))
+            self.assertEqual([record["type"] for record in records], ["match", "aborted"])
+
 
 if __name__ == '__main__':
     unittest.main()